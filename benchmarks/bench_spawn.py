@@ -0,0 +1,116 @@
+"""Benchmark spawn latency and throughput against server RSS per launcher.
+
+Usage:
+    python benchmarks/bench_spawn.py [--rss-mb 0 256 1024] [--iterations 200]
+
+For every RSS size the benchmark grows the current process by that many
+megabytes of touched memory, mimicking a large MCP server, then measures how
+long it takes to spawn /bin/true and reap it through ProcessManager, and how
+many spawns per second each launcher sustains with --concurrency children in
+flight.
+"""
+
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+from typing import Dict, List
+
+from mcp_shell_server.process_manager import ProcessManager
+
+PAGE_SIZE = resource.getpagesize()
+
+
+def grow_rss(megabytes: int) -> bytearray:
+    """Allocate and touch memory so it counts towards RSS."""
+    ballast = bytearray(megabytes * 1024 * 1024)
+    for offset in range(0, len(ballast), PAGE_SIZE):
+        ballast[offset] = 1
+    return ballast
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in megabytes."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * PAGE_SIZE / (1024 * 1024)
+
+
+async def measure(launcher: str, iterations: int) -> List[float]:
+    """Spawn /bin/true repeatedly and return per-spawn latencies in ms."""
+    manager = ProcessManager(launcher=launcher)
+    await manager.start()
+    latencies = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            process = await manager.create_exec_process(["/bin/true"], "/")
+            await process.communicate()
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        await manager.cleanup_all()
+    return latencies
+
+
+async def throughput(launcher: str, iterations: int, concurrency: int) -> float:
+    """Spawn /bin/true iterations times with bounded concurrency, in spawns/sec."""
+    manager = ProcessManager(launcher=launcher)
+    await manager.start()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def spawn_one() -> None:
+        async with semaphore:
+            process = await manager.create_exec_process(["/bin/true"], "/")
+            await process.communicate()
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(spawn_one() for _ in range(iterations)))
+        return iterations / (time.perf_counter() - start)
+    finally:
+        await manager.cleanup_all()
+
+
+async def run(
+    rss_sizes: List[int], iterations: int, concurrency: int, launchers: List[str]
+) -> None:
+    ballast: List[bytearray] = []
+    grown = 0
+    print(
+        f"{'rss_mb':>8} {'launcher':>12} {'p50_ms':>8} {'p99_ms':>8} "
+        f"{'mean_ms':>8} {'spawns/s':>9}"
+    )
+    for size in sorted(rss_sizes):
+        ballast.append(grow_rss(size - grown))
+        grown = size
+        rss = current_rss_mb()
+        results: Dict[str, List[float]] = {}
+        rates: Dict[str, float] = {}
+        for launcher in launchers:
+            results[launcher] = await measure(launcher, iterations)
+            rates[launcher] = await throughput(launcher, iterations, concurrency)
+        for launcher, latencies in results.items():
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(
+                f"{rss:8.0f} {launcher:>12} {statistics.median(latencies):8.3f} "
+                f"{p99:8.3f} {statistics.fmean(latencies):8.3f} "
+                f"{rates[launcher]:9.0f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rss-mb", type=int, nargs="+", default=[0, 256, 1024])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--launchers", nargs="+", default=list(ProcessManager.LAUNCHERS)
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.rss_mb, args.iterations, args.concurrency, args.launchers))
+
+
+if __name__ == "__main__":
+    main()
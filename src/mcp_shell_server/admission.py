@@ -0,0 +1,156 @@
+"""Admission control limiting how many child processes run at once."""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from mcp_shell_server.scheduler import FairScheduler
+
+
+class AdmissionController:
+    """
+    Bounds the number of concurrently running child processes.
+
+    Executions take one slot per process they spawn. When not enough slots are
+    free they wait in a queue of bounded depth, ordered by a FairScheduler
+    across tenants; a full queue rejects new executions immediately and a
+    waiting execution gives up after queue_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queue: int = 256,
+        queue_timeout: Optional[float] = 60.0,
+        scheduler: Optional[FairScheduler] = None,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrent (int): Slots available, 0 or less for no limit
+            max_queue (int): Executions allowed to wait for a slot, 0 rejects
+                whenever all slots are taken
+            queue_timeout (Optional[float]): Seconds an execution may wait,
+                None or 0 to wait indefinitely
+            scheduler (Optional[FairScheduler]): Orders waiting executions,
+                defaults to equal weights for every tenant
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout or None
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.scheduler: FairScheduler = scheduler or FairScheduler()
+        self._waiters: Dict[asyncio.Future, Tuple[int, str]] = {}
+
+    @property
+    def queued(self) -> int:
+        """Number of executions waiting for a slot."""
+        return len(self._waiters)
+
+    def _weight(self, weight: int) -> int:
+        # A request larger than the limit would never fit, let it run alone
+        if self.max_concurrent <= 0:
+            return max(weight, 1)
+        return min(max(weight, 1), self.max_concurrent)
+
+    def _fits(self, weight: int) -> bool:
+        return self.max_concurrent <= 0 or self.active + weight <= self.max_concurrent
+
+    async def acquire(self, weight: int = 1, tenant: str = "default") -> float:
+        """
+        Wait for slots.
+
+        Args:
+            weight (int): Number of processes the execution spawns
+            tenant (str): Scheduler class the execution is accounted to
+
+        Returns:
+            float: Seconds spent waiting in the queue
+
+        Raises:
+            ValueError: If the queue is full or the wait timed out
+        """
+        weight = self._weight(weight)
+        if not self._waiters and self._fits(weight):
+            self.active += weight
+            self.admitted += 1
+            self.scheduler.record(tenant)
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ValueError(
+                f"Too many commands waiting to run ({len(self._waiters)} queued)"
+            )
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[future] = (weight, tenant)
+        self.scheduler.push(tenant, future, weight)
+        try:
+            # Unlike wait_for on Python 3.11, timeout() never drops a
+            # cancellation that races with the grant
+            async with asyncio.timeout(self.queue_timeout):
+                await future
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # The slots were granted just as the wait was abandoned
+                self.release(weight)
+            else:
+                future.cancel()
+                self._waiters.pop(future, None)
+                self.scheduler.discard(future)
+                # Executions queued behind this one may fit now
+                self._wake()
+            if isinstance(e, TimeoutError):
+                self.timed_out += 1
+                raise ValueError(
+                    f"Timed out after {self.queue_timeout} seconds waiting to run"
+                ) from e
+            raise
+        self.admitted += 1
+        return time.monotonic() - start
+
+    def release(self, weight: int = 1) -> None:
+        """
+        Return slots taken by acquire.
+
+        Args:
+            weight (int): The weight passed to acquire
+        """
+        self.active -= self._weight(weight)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant slots to waiters in scheduler order while they fit."""
+        while True:
+            future = self.scheduler.peek()
+            if future is None:
+                return
+            weight, _ = self._waiters[future]
+            if not self._fits(weight):
+                return
+            self.scheduler.pop()
+            del self._waiters[future]
+            self.active += weight
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current state and counters.
+
+        Returns:
+            Dict[str, Any]: Active slots, queue length and admission counters
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "classes": self.scheduler.stats(),
+        }
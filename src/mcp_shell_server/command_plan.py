@@ -0,0 +1,271 @@
+"""
+Compiles a command token list into an immutable, cached execution plan.
+"""
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+
+from mcp_shell_server.command_validator import CommandValidator
+
+PIPELINE_OPERATORS = frozenset((";", "&&", "||"))
+REDIRECT_OPERATORS = frozenset((">", ">>", "<"))
+
+
+@dataclass(frozen=True)
+class Redirects:
+    """File redirections of a single stage."""
+
+    stdin: Optional[str] = None
+    stdout: Optional[str] = None
+    stdout_append: bool = False
+
+    def as_dict(self) -> Dict[str, Union[None, str, bool]]:
+        """Get the redirections in the format used by IORedirectionHandler"""
+        return {
+            "stdin": self.stdin,
+            "stdout": self.stdout,
+            "stdout_append": self.stdout_append,
+        }
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A single command of a plan, without its redirection tokens."""
+
+    argv: Tuple[str, ...]
+    redirects: Redirects
+
+
+@dataclass(frozen=True)
+class CommandPlan:
+    """
+    Result of compiling a command.
+
+    Attributes:
+        stages: Commands to run, more than one for pipelines
+        is_pipeline: Whether the command contained a pipe operator
+        error: Validation error, None if the command may be executed
+    """
+
+    stages: Tuple[Stage, ...]
+    is_pipeline: bool = False
+    error: Optional[str] = None
+
+
+def _tokenize(command: Iterable[str]) -> Iterator[str]:
+    """Yield tokens the way CommandPreProcessor.preprocess_command and
+    clean_command would produce them."""
+    for token in command:
+        if token in PIPELINE_OPERATORS:
+            yield token
+        elif "|" in token and token != "|":
+            for part in token.split("|"):
+                part = part.strip()
+                if part:
+                    yield part
+            yield "|"
+        elif token:
+            yield token
+
+
+class _StageBuilder:
+    """Parses the redirections of one stage while tokens stream in."""
+
+    def __init__(self):
+        self.tokens = 0
+        self.first: Optional[str] = None
+        self.argv: List[str] = []
+        self.stdin: Optional[str] = None
+        self.stdout: Optional[str] = None
+        self.stdout_append = False
+        self.pending: Optional[str] = None
+        self.previous: Optional[str] = None
+        # First error as reported by CommandPreProcessor.parse_command
+        self.parse_error: Optional[str] = None
+        # First error as reported by IORedirectionHandler.process_redirections
+        self.syntax_error: Optional[str] = None
+        self.redirect_error: Optional[str] = None
+
+    def add(self, token: str) -> None:
+        if self.first is None:
+            self.first = token
+        self.tokens += 1
+        if (
+            self.syntax_error is None
+            and token in REDIRECT_OPERATORS
+            and self.previous in REDIRECT_OPERATORS
+        ):
+            self.syntax_error = "Invalid redirection syntax: consecutive operators"
+        self.previous = token
+
+        pending, self.pending = self.pending, None
+        if pending is None:
+            if token in REDIRECT_OPERATORS:
+                self.pending = token
+            else:
+                self.argv.append(token)
+            return
+
+        if token in REDIRECT_OPERATORS:
+            error = "Invalid redirection target: operator found"
+            if self.redirect_error is None:
+                self.redirect_error = error
+            if pending != "<" and self.parse_error is None:
+                self.parse_error = error
+        if pending == "<":
+            self.stdin = token
+        else:
+            self.stdout = token
+            self.stdout_append = pending == ">>"
+
+    def finish(self) -> Stage:
+        if self.pending is not None:
+            kind = "input" if self.pending == "<" else "output"
+            error = f"Missing path for {kind} redirection"
+            if self.parse_error is None:
+                self.parse_error = error
+            if self.redirect_error is None:
+                self.redirect_error = error
+        return Stage(
+            tuple(self.argv), Redirects(self.stdin, self.stdout, self.stdout_append)
+        )
+
+    @property
+    def io_error(self) -> Optional[str]:
+        return self.syntax_error or self.redirect_error
+
+
+def _validate_argv(argv: Tuple[str, ...], allowed_commands: FrozenSet[str]) -> None:
+    """Mirror CommandValidator.validate_command."""
+    if not argv:
+        raise ValueError("Empty command")
+    if not allowed_commands:
+        raise ValueError(
+            "No commands are allowed. Please set ALLOW_COMMANDS environment variable."
+        )
+    if argv[0].strip() not in allowed_commands:
+        raise ValueError(f"Command not allowed: {argv[0].strip()}")
+
+
+def compile_command(
+    command: Iterable[str], allowed_commands: FrozenSet[str]
+) -> CommandPlan:
+    """
+    Compile a command in a single pass over its tokens.
+
+    Produces the same stages and reports the same first error as running
+    preprocessing, pipeline validation, operator checks, redirection parsing and
+    whitelist validation one after another.
+
+    Args:
+        command (Iterable[str]): Command tokens as received in the request
+        allowed_commands (FrozenSet[str]): Whitelisted command names
+
+    Returns:
+        CommandPlan: Plan with its validation verdict
+    """
+    builders = [_StageBuilder()]
+    operator_error: Optional[str] = None
+    pipeline_error: Optional[str] = None
+    is_pipeline = False
+
+    for token in _tokenize(command):
+        if token == "|":
+            is_pipeline = True
+            current = builders[-1]
+            if pipeline_error is None:
+                if current.first is None:
+                    pipeline_error = "Empty command before pipe operator"
+                elif current.first.strip() not in allowed_commands:
+                    pipeline_error = f"Command not allowed: {current.first}"
+            if current.tokens:
+                builders.append(_StageBuilder())
+            continue
+
+        if token in PIPELINE_OPERATORS:
+            if operator_error is None:
+                operator_error = f"Unexpected shell operator: {token}"
+            if pipeline_error is None:
+                pipeline_error = f"Unexpected shell operator in pipeline: {token}"
+        builders[-1].add(token)
+
+    if not builders[-1].tokens:
+        builders.pop()
+    if not builders:
+        return CommandPlan((), is_pipeline, pipeline_error or "Empty command")
+    stages = tuple(builder.finish() for builder in builders)
+
+    try:
+        if is_pipeline:
+            last = builders[-1].first or ""
+            if pipeline_error is None and last.strip() not in allowed_commands:
+                pipeline_error = f"Command not allowed: {last}"
+            if pipeline_error:
+                raise ValueError(pipeline_error)
+            for builder in builders:
+                if builder.io_error:
+                    raise ValueError(builder.io_error)
+            if not all(stage.argv for stage in stages):
+                raise ValueError("Empty command")
+        else:
+            builder, stage = builders[0], stages[0]
+            if operator_error:
+                raise ValueError(operator_error)
+            if builder.parse_error:
+                raise ValueError(builder.parse_error)
+            _validate_argv(stage.argv, allowed_commands)
+            if builder.io_error:
+                raise ValueError(builder.io_error)
+    except ValueError as e:
+        return CommandPlan(stages, is_pipeline, str(e))
+
+    return CommandPlan(stages, is_pipeline)
+
+
+class CommandPlanner:
+    """
+    Caches compiled plans by request tokens and the whitelist they were checked
+    against, so repeated commands skip parsing and validation entirely.
+    """
+
+    def __init__(self, validator: CommandValidator, cache_size: int = 1024):
+        """
+        Initialize the planner.
+
+        Args:
+            validator (CommandValidator): Source of the allowed commands
+            cache_size (int): Number of plans kept
+        """
+        self.validator = validator
+        self.cache_size = cache_size
+        self._plans: "OrderedDict[Tuple[Tuple[str, ...], str, str], CommandPlan]" = (
+            OrderedDict()
+        )
+
+    def plan(self, command: List[str]) -> CommandPlan:
+        """
+        Get the execution plan of a command.
+
+        Args:
+            command (List[str]): Command tokens as received in the request
+
+        Returns:
+            CommandPlan: Cached or freshly compiled plan
+        """
+        key = (
+            tuple(command),
+            os.environ.get("ALLOW_COMMANDS", ""),
+            os.environ.get("ALLOWED_COMMANDS", ""),
+        )
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+
+        plan = compile_command(key[0], frozenset(self.validator.get_allowed_commands()))
+        self._plans[key] = plan
+        if len(self._plans) > self.cache_size:
+            self._plans.popitem(last=False)
+        return plan
@@ -57,6 +57,13 @@ class CommandPreProcessor:
 
         return " ".join(escaped_args)
 
+    def create_exec_args(self, command: List[str]) -> List[str]:
+        """
+        Create an argv list for direct execution from a list of arguments.
+        Mirrors create_shell_command so both spawn paths see the same arguments.
+        """
+        return [arg if arg.isspace() else arg.strip() for arg in command]
+
     def split_pipe_commands(self, command: List[str]) -> List[List[str]]:
         """
         Split commands by pipe operator into separate commands.
@@ -3,7 +3,10 @@ Provides validation for shell commands and ensures they are allowed to be execut
 """
 
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from mcp_shell_server.config import env_float
+from mcp_shell_server.executable_resolver import ExecutableResolver
 
 
 class CommandValidator:
@@ -15,7 +18,9 @@ class CommandValidator:
         """
         Initialize the validator.
         """
-        pass
+        self.resolver = ExecutableResolver(
+            check_interval=env_float("MCP_SHELL_RESOLVER_CHECK_INTERVAL", 1.0)
+        )
 
     def _get_allowed_commands(self) -> set[str]:
         """Get the set of allowed commands from environment variables"""
@@ -28,6 +33,12 @@ class CommandValidator:
         """Get the list of allowed commands from environment variables"""
         return list(self._get_allowed_commands())
 
+    def get_resolved_commands(
+        self, path: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """Get the absolute executable path of every allowed command"""
+        return self.resolver.resolve_all(self._get_allowed_commands(), path)
+
     def is_command_allowed(self, command: str) -> bool:
         """Check if a command is in the allowed list"""
         cmd = command.strip()
@@ -0,0 +1,40 @@
+"""Helpers for reading tuning settings from environment variables."""
+
+import os
+from typing import Optional
+
+
+def env_str(name: str, default: str) -> str:
+    """Get a stripped string setting, falling back to default when unset or empty."""
+    value = os.environ.get(name, "").strip()
+    return value or default
+
+
+def env_int(name: str, default: int) -> int:
+    """Get an integer setting.
+
+    Raises:
+        ValueError: If the variable is set but is not an integer
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an integer: {value}") from e
+
+
+def env_float(name: str, default: Optional[float]) -> Optional[float]:
+    """Get a float setting.
+
+    Raises:
+        ValueError: If the variable is set but is not a number
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be a number: {value}") from e
@@ -0,0 +1,120 @@
+"""Cached environment blocks for child processes."""
+
+import os
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+# Variables passed through by the minimal profile
+MINIMAL_ENV_VARS = (
+    "HOME",
+    "LANG",
+    "LANGUAGE",
+    "LC_ALL",
+    "LC_CTYPE",
+    "LOGNAME",
+    "PATH",
+    "SHELL",
+    "TERM",
+    "TMPDIR",
+    "TZ",
+    "USER",
+)
+
+ENV_PROFILES = ("full", "minimal")
+
+
+def _server_environment() -> Mapping:
+    # os.environ keeps its values in a plain dict; comparing against it avoids
+    # copying the whole environment just to detect a mutation
+    return getattr(os.environ, "_data", os.environ)
+
+
+class EnvironmentCache:
+    """
+    Builds the environment of child processes and caches it per set of overrides.
+
+    Each entry is the server environment, optionally reduced to an allowlist,
+    merged with the overrides of a command. Entries are dropped as soon as the
+    server's own environment changes.
+    """
+
+    def __init__(
+        self,
+        profile: str = "full",
+        allowlist: Optional[Iterable[str]] = None,
+        max_entries: int = 128,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            profile (str): "full" passes the whole server environment, "minimal"
+                only MINIMAL_ENV_VARS and the allowlist
+            allowlist (Optional[Iterable[str]]): Extra variables kept by the
+                minimal profile
+            max_entries (int): Number of override sets kept
+
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        profile = profile.strip().lower()
+        if profile not in ENV_PROFILES:
+            raise ValueError(f"Invalid environment profile: {profile}")
+        self.profile = profile
+        self.allowlist: FrozenSet[str] = frozenset(MINIMAL_ENV_VARS).union(
+            name.strip() for name in (allowlist or ()) if name.strip()
+        )
+        self.max_entries = max_entries
+        self._source: Mapping = {}
+        self._base: Optional[Dict[str, str]] = None
+        self._entries: "OrderedDict[FrozenSet[Tuple[str, str]], Dict[str, str]]" = (
+            OrderedDict()
+        )
+
+    def _get_base(self) -> Dict[str, str]:
+        source = _server_environment()
+        if self._base is None or source != self._source:
+            self._source = dict(source)
+            self._entries.clear()
+            if self.profile == "minimal":
+                self._base = {
+                    name: value
+                    for name, value in os.environ.items()
+                    if name in self.allowlist
+                }
+            else:
+                self._base = dict(os.environ)
+        return self._base
+
+    def get(self, envs: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Get the complete environment for a child.
+
+        The returned dict is shared between callers and must not be modified.
+
+        Args:
+            envs (Optional[Dict[str, str]]): Variables overriding the server's
+
+        Returns:
+            Dict[str, str]: Environment of the child
+        """
+        base = self._get_base()
+        if not envs:
+            return base
+
+        key = frozenset(envs.items())
+        merged = self._entries.get(key)
+        if merged is not None:
+            self._entries.move_to_end(key)
+            return merged
+
+        merged = {**base, **envs}
+        self._entries[key] = merged
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return merged
+
+    def clear(self) -> None:
+        """Drop every cached environment."""
+        self._base = None
+        self._entries.clear()
@@ -0,0 +1,114 @@
+"""
+Resolves allowed commands to absolute executable paths and caches the result.
+"""
+
+import os
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class _PathTable:
+    """Resolved executables for one PATH value."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.directories: List[str] = [d for d in path.split(os.pathsep) if d]
+        self.mtimes = self._snapshot()
+        self.checked_at = time.monotonic()
+        self.entries: Dict[str, Optional[str]] = {}
+
+    def _snapshot(self) -> Tuple[Optional[int], ...]:
+        mtimes = []
+        for directory in self.directories:
+            try:
+                mtimes.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def is_stale(self) -> bool:
+        """Whether any PATH directory changed since the table was built."""
+        self.checked_at = time.monotonic()
+        return self._snapshot() != self.mtimes
+
+
+class ExecutableResolver:
+    """
+    Maps command names to absolute paths with a single PATH walk per name.
+
+    A table is kept per PATH value. Installing, removing or renaming a program
+    changes the mtime of its directory, which invalidates the whole table; the
+    directories are re-checked at most once every check_interval seconds, so
+    lookups between checks never touch the filesystem.
+    """
+
+    MAX_TABLES = 16
+
+    def __init__(self, check_interval: float = 1.0):
+        """
+        Initialize the resolver.
+
+        Args:
+            check_interval (float): Minimum seconds between PATH mtime checks
+        """
+        self.check_interval = check_interval
+        self._tables: Dict[str, _PathTable] = {}
+
+    def _get_table(self, path: str) -> _PathTable:
+        table = self._tables.get(path)
+        if table is not None:
+            if time.monotonic() - table.checked_at < self.check_interval:
+                return table
+            if not table.is_stale():
+                return table
+
+        if table is None and len(self._tables) >= self.MAX_TABLES:
+            self._tables.clear()
+        table = _PathTable(path)
+        self._tables[path] = table
+        return table
+
+    def invalidate(self) -> None:
+        """Drop every cached resolution."""
+        self._tables.clear()
+
+    def resolve(self, command: str, path: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve a command name to the absolute path of its executable.
+
+        Args:
+            command (str): Command name; names containing a slash are returned as-is
+            path (Optional[str]): PATH to search, defaults to the server's PATH
+
+        Returns:
+            Optional[str]: Absolute path, or None if no executable was found
+        """
+        command = command.strip()
+        if "/" in command:
+            return command
+
+        table = self._get_table(os.environ.get("PATH", "") if path is None else path)
+        try:
+            return table.entries[command]
+        except KeyError:
+            resolved = shutil.which(command, path=table.path)
+            if resolved is not None:
+                resolved = os.path.abspath(resolved)
+            table.entries[command] = resolved
+            return resolved
+
+    def resolve_all(
+        self, commands: Iterable[str], path: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Resolve several commands at once.
+
+        Args:
+            commands (Iterable[str]): Command names
+            path (Optional[str]): PATH to search, defaults to the server's PATH
+
+        Returns:
+            Dict[str, Optional[str]]: Command name to absolute path or None
+        """
+        return {command: self.resolve(command, path) for command in sorted(commands)}
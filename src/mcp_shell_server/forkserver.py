@@ -0,0 +1,117 @@
+"""Fork server helper process.
+
+This file is executed as a standalone script by ForkServerClient, in a fresh
+interpreter, so the helper never inherits the address space of the MCP server.
+It must only import from the standard library.
+
+Protocol, one Unix socket connection per spawn:
+
+* request: 4-byte big-endian length + JSON object with "argv", "executable",
+  "cwd", "env" and "start_new_session"; the child's stdin, stdout and stderr
+  file descriptors are attached to the first message with SCM_RIGHTS.
+* responses: newline-delimited JSON objects, first {"pid": int} or
+  {"error": str}, then {"returncode": int} once the child has exited.
+"""
+
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+
+_HEADER = struct.Struct("!I")
+_MAX_FDS = 3
+
+
+def _recv_request(conn: socket.socket):
+    """Receive one request and the file descriptors attached to it."""
+    data, fds, _, _ = socket.recv_fds(conn, 65536, _MAX_FDS)
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated request header")
+    (length,) = _HEADER.unpack_from(data)
+    payload = bytearray(data[_HEADER.size :])
+    while len(payload) < length:
+        chunk = conn.recv(length - len(payload))
+        if not chunk:
+            raise ValueError("Truncated request body")
+        payload += chunk
+    return json.loads(payload), fds
+
+
+def _send(conn: socket.socket, message: dict) -> None:
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _handle(conn: socket.socket) -> None:
+    """Spawn the requested child and report its pid and exit status."""
+    fds = []
+    try:
+        request, fds = _recv_request(conn)
+        if len(fds) != _MAX_FDS:
+            raise ValueError("Expected stdin, stdout and stderr descriptors")
+        try:
+            process = subprocess.Popen(
+                request["argv"],
+                executable=request.get("executable"),
+                stdin=fds[0],
+                stdout=fds[1],
+                stderr=fds[2],
+                cwd=request.get("cwd"),
+                env=request.get("env"),
+                start_new_session=bool(request.get("start_new_session")),
+            )
+        except OSError as e:
+            _send(conn, {"error": str(e), "errno": e.errno})
+            return
+        finally:
+            for fd in fds:
+                os.close(fd)
+            fds = []
+
+        _send(conn, {"pid": process.pid})
+        _send(conn, {"returncode": process.wait()})
+    except Exception as e:  # Report anything else to the client
+        try:
+            _send(conn, {"error": str(e)})
+        except OSError:
+            pass
+    finally:
+        for fd in fds:
+            os.close(fd)
+        conn.close()
+
+
+def _exit_with_parent() -> None:
+    """Exit as soon as the parent closes our stdin."""
+    try:
+        while sys.stdin.buffer.read(4096):
+            pass
+    finally:
+        os._exit(0)
+
+
+def serve(path: str) -> None:
+    """Listen on a Unix socket and serve spawn requests forever.
+
+    Args:
+        path: Filesystem path of the Unix socket to create
+    """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(128)
+    threading.Thread(target=_exit_with_parent, daemon=True).start()
+
+    # Tell the client the socket is ready
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    while True:
+        conn, _ = server.accept()
+        threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1])
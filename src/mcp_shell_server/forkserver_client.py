@@ -0,0 +1,221 @@
+"""Client side of the fork server helper process."""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+from typing import Dict, List, Optional, Set
+
+from mcp_shell_server import forkserver
+from mcp_shell_server.spawned_process import (
+    SpawnedProcess,
+    StdioSpec,
+    connect_streams,
+    prepare_stdio,
+)
+
+_HEADER = struct.Struct("!I")
+
+
+class ForkServerClient:
+    """Spawns children through a small helper process instead of forking the server.
+
+    The helper is a fresh Python interpreter that only imports the standard
+    library, so forking it stays cheap no matter how large the MCP server grows.
+    """
+
+    def __init__(self):
+        """Initialize the client; the helper is started on first use."""
+        self._helper: Optional[asyncio.subprocess.Process] = None
+        self._socket_dir: Optional[str] = None
+        self._socket_path: Optional[str] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._exit_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the helper process is alive."""
+        return self._helper is not None and self._helper.returncode is None
+
+    async def start(self) -> None:
+        """Start the helper process if it is not running yet.
+
+        Raises:
+            ValueError: If the helper fails to start
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.is_running:
+                return
+            self._cleanup_socket()
+            self._socket_dir = tempfile.mkdtemp(prefix="mcp-forkserver-")
+            self._socket_path = os.path.join(self._socket_dir, "spawn.sock")
+            try:
+                self._helper = await asyncio.create_subprocess_exec(
+                    sys.executable,
+                    "-I",
+                    "-S",
+                    forkserver.__file__,
+                    self._socket_path,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    cwd="/",
+                )
+                assert self._helper.stdout is not None
+                ready = await asyncio.wait_for(self._helper.stdout.readline(), 10)
+            except (OSError, asyncio.TimeoutError) as e:
+                await self.close()
+                raise ValueError(f"Failed to start fork server: {e}") from e
+            if ready.strip() != b"ready":
+                await self.close()
+                raise ValueError("Fork server did not become ready")
+
+    async def spawn(
+        self,
+        argv: List[str],
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        stdin: StdioSpec = asyncio.subprocess.PIPE,
+        stdout: StdioSpec = asyncio.subprocess.PIPE,
+        stderr: StdioSpec = asyncio.subprocess.PIPE,
+        start_new_session: bool = False,
+        executable: Optional[str] = None,
+    ) -> SpawnedProcess:
+        """Spawn a child through the helper.
+
+        Args:
+            argv: Program and its arguments
+            cwd: Working directory of the child
+            env: Complete environment of the child
+            stdin: PIPE, DEVNULL, a file descriptor or a file object
+            stdout: PIPE, DEVNULL, a file descriptor or a file object
+            stderr: PIPE, DEVNULL, a file descriptor or a file object
+            start_new_session: Run the child in a new session
+            executable: Program to execute instead of searching argv[0]
+
+        Returns:
+            SpawnedProcess: Handle on the running child
+
+        Raises:
+            OSError: If the child cannot be executed
+        """
+        if not self.is_running:
+            await self.start()
+        assert self._socket_path is not None
+
+        loop = asyncio.get_running_loop()
+        child_fds: List[int] = []
+        parent_fds: List[Optional[int]] = []
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            for spec, for_reading in ((stdin, False), (stdout, True), (stderr, True)):
+                child_fd, parent_fd = prepare_stdio(spec, for_reading)
+                assert child_fd is not None
+                child_fds.append(child_fd)
+                parent_fds.append(parent_fd)
+
+            payload = json.dumps(
+                {
+                    "argv": argv,
+                    "executable": executable,
+                    "cwd": cwd,
+                    "env": env,
+                    "start_new_session": start_new_session,
+                }
+            ).encode()
+            conn.setblocking(False)
+            await loop.sock_connect(conn, self._socket_path)
+            message = _HEADER.pack(len(payload)) + payload
+            sent = socket.send_fds(conn, [message[:65536]], child_fds)
+            if sent < len(message):
+                await loop.sock_sendall(conn, message[sent:])
+        except BaseException:
+            conn.close()
+            for fd in parent_fds:
+                if fd is not None:
+                    os.close(fd)
+            raise
+        finally:
+            # The helper holds its own copies now
+            for fd in child_fds:
+                os.close(fd)
+
+        reader = _ResponseReader(conn)
+        try:
+            response = await reader.next()
+            if "pid" not in response:
+                errno = response.get("errno")
+                if errno is not None:
+                    raise OSError(errno, response.get("error"))
+                raise OSError(response.get("error", "Fork server spawn failed"))
+        except BaseException:
+            conn.close()
+            for fd in parent_fds:
+                if fd is not None:
+                    os.close(fd)
+            raise
+
+        exit_future: "asyncio.Future[int]" = loop.create_future()
+        task = asyncio.create_task(reader.wait_exit(exit_future))
+        self._exit_tasks.add(task)
+        task.add_done_callback(self._exit_tasks.discard)
+        streams = await connect_streams(*parent_fds)
+        return SpawnedProcess(response["pid"], exit_future, *streams)
+
+    def _cleanup_socket(self) -> None:
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+            self._socket_path = None
+
+    async def close(self) -> None:
+        """Stop the helper process."""
+        helper, self._helper = self._helper, None
+        if helper is not None and helper.returncode is None:
+            try:
+                if helper.stdin is not None:
+                    helper.stdin.close()
+                await asyncio.wait_for(helper.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                helper.kill()
+                await helper.wait()
+            except Exception as e:
+                logging.warning(f"Error stopping fork server: {e}")
+        self._cleanup_socket()
+
+
+class _ResponseReader:
+    """Reads newline-delimited JSON responses for one spawn request."""
+
+    def __init__(self, conn: socket.socket):
+        self._conn = conn
+        self._buffer = b""
+
+    async def next(self) -> dict:
+        loop = asyncio.get_running_loop()
+        while b"\n" not in self._buffer:
+            chunk = await loop.sock_recv(self._conn, 4096)
+            if not chunk:
+                raise OSError("Fork server closed the connection")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    async def wait_exit(self, exit_future: "asyncio.Future[int]") -> None:
+        """Resolve exit_future with the child's exit status."""
+        try:
+            response = await self.next()
+            returncode = int(response["returncode"])
+        except Exception as e:
+            logging.warning(f"Lost exit status from fork server: {e}")
+            returncode = 255
+        finally:
+            self._conn.close()
+        if not exit_future.done():
+            exit_future.set_result(returncode)
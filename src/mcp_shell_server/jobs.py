@@ -0,0 +1,208 @@
+"""Background jobs: commands that keep running after the call that started them."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from mcp_shell_server.output_store import StoredOutput
+
+JOB_STATES = ("running", "succeeded", "failed", "cancelled")
+
+# Result fields replaced by reading the job output incrementally
+_OUTPUT_FIELDS = ("stdout", "stderr", "truncated", "dropped_bytes", "output_id")
+
+
+class Job:
+    """A command running in the background and its outcome."""
+
+    def __init__(
+        self, job_id: str, command: List[str], directory: str, output: StoredOutput
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            job_id (str): ID returned to the caller
+            command (List[str]): Command and its arguments
+            directory (str): Working directory
+            output (StoredOutput): Receives the output while the job runs
+        """
+        self.job_id = job_id
+        self.command = command
+        self.directory = directory
+        self.output = output
+        self.state = "running"
+        self.result: Optional[Dict[str, Any]] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def finish(self, state: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record the outcome and wake the waiters.
+
+        Args:
+            state (str): Final state, one of JOB_STATES
+            result (Optional[Dict[str, Any]]): Execution result, without the
+                output fields
+        """
+        self.state = state
+        self.result = (
+            {k: v for k, v in result.items() if k not in _OUTPUT_FIELDS}
+            if result is not None
+            else None
+        )
+        self.finished_at = time.time()
+        self.done.set()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get the job state.
+
+        Returns:
+            Dict[str, Any]: State, timing, output sizes and, once finished,
+                the execution result
+        """
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "command": self.command,
+            "directory": self.directory,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed": end - self.started_at,
+            "output_bytes": {
+                name: spool.size for name, spool in self.output.streams.items()
+            },
+            "result": self.result,
+        }
+
+
+class JobRegistry:
+    """
+    Tracks background jobs.
+
+    At most max_running jobs run at once. Finished jobs are kept for ttl
+    seconds and at most max_finished of them; their output is released when
+    they are dropped.
+    """
+
+    def __init__(
+        self,
+        max_running: int = 32,
+        max_finished: int = 64,
+        ttl: Optional[float] = 3600.0,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_running (int): Jobs allowed to run at once
+            max_finished (int): Finished jobs kept for status and output reads
+            ttl (Optional[float]): Seconds a finished job is kept, None or 0
+                to keep it until max_finished pushes it out
+        """
+        self.max_running = max_running
+        self.max_finished = max_finished
+        self.ttl = ttl or None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    @property
+    def running(self) -> int:
+        """Number of jobs still running."""
+        return sum(1 for job in self._jobs.values() if job.state == "running")
+
+    def _prune(self) -> None:
+        """Drop finished jobs past their retention."""
+        finished = [job for job in self._jobs.values() if job.state != "running"]
+        finished.sort(key=lambda job: job.finished_at or 0.0)
+        now = time.time()
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            expired = self.ttl is not None and now - (job.finished_at or now) > self.ttl
+            if index < excess or expired:
+                del self._jobs[job.job_id]
+                job.output.close()
+
+    def add(self, job: Job) -> None:
+        """
+        Track a new job.
+
+        Args:
+            job (Job): Job that is about to start
+
+        Raises:
+            ValueError: If max_running jobs are already running
+        """
+        self._prune()
+        if self.running >= self.max_running:
+            raise ValueError(f"Too many running jobs (limit {self.max_running})")
+        self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Job:
+        """
+        Get a job.
+
+        Args:
+            job_id (str): ID returned when the job was started
+
+        Returns:
+            Job: The job
+
+        Raises:
+            ValueError: If the job is unknown or was dropped
+        """
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job id: {job_id}")
+        return job
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """
+        Wait until a job finishes or the timeout passes.
+
+        Args:
+            job_id (str): ID of the job
+            timeout (Optional[float]): Seconds to wait, None to wait until done
+
+        Returns:
+            Job: The job, still running if the timeout passed first
+
+        Raises:
+            ValueError: If the job is unknown
+        """
+        job = self.get(job_id)
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a job and wait until its processes are gone.
+
+        Args:
+            job_id (str): ID of the job
+
+        Returns:
+            Job: The job, in its final state
+
+        Raises:
+            ValueError: If the job is unknown
+        """
+        job = self.get(job_id)
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    async def cancel_all(self) -> None:
+        """Cancel every running job."""
+        for job in list(self._jobs.values()):
+            if job.state == "running":
+                await self.cancel(job.job_id)
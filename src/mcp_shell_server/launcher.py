@@ -0,0 +1,325 @@
+"""Pluggable strategies for starting child processes."""
+
+import asyncio
+import os
+import shutil
+import signal
+import threading
+from typing import Any, Dict, List, Optional, Type
+
+from mcp_shell_server.forkserver_client import ForkServerClient
+from mcp_shell_server.spawned_process import (
+    SpawnedProcess,
+    StdioSpec,
+    connect_streams,
+    prepare_stdio,
+)
+
+RESTORED_SIGNALS = tuple(
+    getattr(signal, name)
+    for name in ("SIGPIPE", "SIGXFZ", "SIGXFSZ")
+    if hasattr(signal, name)
+)
+
+
+class ProcessLauncher:
+    """Base class for process launchers used by ProcessManager.
+
+    Launchers return objects with the asyncio.subprocess.Process interface:
+    pid, returncode, stdin/stdout/stderr streams, wait(), communicate(),
+    send_signal(), terminate() and kill().
+    """
+
+    name = ""
+
+    async def start(self) -> None:
+        """Prepare the launcher ahead of the first spawn."""
+
+    async def close(self) -> None:
+        """Release resources held by the launcher."""
+
+    async def spawn_exec(
+        self,
+        argv: List[str],
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        stdin: StdioSpec = asyncio.subprocess.PIPE,
+        stdout: StdioSpec = asyncio.subprocess.PIPE,
+        stderr: StdioSpec = asyncio.subprocess.PIPE,
+        start_new_session: bool = False,
+        executable: Optional[str] = None,
+    ) -> Any:
+        """Start argv directly.
+
+        Args:
+            argv: Program and its arguments
+            cwd: Working directory of the child
+            env: Complete environment of the child
+            stdin: PIPE, DEVNULL, a file descriptor or a file object
+            stdout: PIPE, DEVNULL, a file descriptor or a file object
+            stderr: PIPE, DEVNULL, a file descriptor or a file object
+            start_new_session: Run the child in a new session (setsid)
+            executable: Program to execute instead of searching argv[0]
+
+        Returns:
+            Process object for the child
+
+        Raises:
+            OSError: If the child cannot be started
+        """
+        raise NotImplementedError
+
+    async def spawn_shell(self, cmd: str, **kwargs: Any) -> Any:
+        """Start a command line through /bin/sh; accepts spawn_exec's options."""
+        return await self.spawn_exec(["/bin/sh", "-c", cmd], **kwargs)
+
+
+class AsyncioLauncher(ProcessLauncher):
+    """Launches children with asyncio's subprocess transports (fork + exec)."""
+
+    name = "asyncio"
+
+    async def spawn_exec(
+        self,
+        argv: List[str],
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        stdin: StdioSpec = asyncio.subprocess.PIPE,
+        stdout: StdioSpec = asyncio.subprocess.PIPE,
+        stderr: StdioSpec = asyncio.subprocess.PIPE,
+        start_new_session: bool = False,
+        executable: Optional[str] = None,
+    ) -> asyncio.subprocess.Process:
+        kwargs: Dict[str, Any] = {}
+        if executable:
+            kwargs["executable"] = executable
+        return await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            env=env,
+            cwd=cwd,
+            start_new_session=start_new_session,
+            **kwargs,
+        )
+
+    async def spawn_shell(
+        self,
+        cmd: str,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        stdin: StdioSpec = asyncio.subprocess.PIPE,
+        stdout: StdioSpec = asyncio.subprocess.PIPE,
+        stderr: StdioSpec = asyncio.subprocess.PIPE,
+        start_new_session: bool = False,
+    ) -> asyncio.subprocess.Process:
+        kwargs: Dict[str, Any] = {}
+        if start_new_session:
+            kwargs["start_new_session"] = True
+        return await asyncio.create_subprocess_shell(
+            cmd,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            env=env,
+            cwd=cwd,
+            **kwargs,
+        )
+
+
+class PosixSpawnLauncher(ProcessLauncher):
+    """Launches children with os.posix_spawn, avoiding a fork of the server.
+
+    Exit notification follows asyncio's own child watchers: a pidfd registered
+    with the event loop where the kernel supports it, otherwise a thread
+    blocking in waitpid().
+    """
+
+    name = "posix_spawn"
+
+    # posix_spawn has no portable chdir action, the working directory is
+    # switched around the call and must not interleave between threads
+    _cwd_lock = threading.Lock()
+
+    @classmethod
+    def _posix_spawn(
+        cls,
+        argv: List[str],
+        cwd: Optional[str],
+        env: Dict[str, str],
+        file_actions: List[Any],
+        setsid: bool,
+        executable: Optional[str] = None,
+    ) -> int:
+        program = executable or argv[0]
+        if "/" not in program:
+            program = shutil.which(program, path=env.get("PATH")) or program
+
+        # Like subprocess' restore_signals, so the server ignoring SIGPIPE does
+        # not leak into children and break pipelines
+        options: Dict[str, Any] = {
+            "file_actions": file_actions,
+            "setsid": setsid,
+            "setsigdef": RESTORED_SIGNALS,
+        }
+
+        def spawn() -> int:
+            if "/" in program:
+                return os.posix_spawn(program, argv, env, **options)
+            return os.posix_spawnp(program, argv, env, **options)
+
+        if not cwd:
+            return spawn()
+        with cls._cwd_lock:
+            previous = os.open(".", os.O_RDONLY)
+            try:
+                os.chdir(cwd)
+                return spawn()
+            finally:
+                os.fchdir(previous)
+                os.close(previous)
+
+    @staticmethod
+    def _watch_exit(pid: int) -> "asyncio.Future[int]":
+        """Return a future resolved with the exit status of pid."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[int]" = loop.create_future()
+
+        def resolve(status: int) -> None:
+            if not future.done():
+                future.set_result(os.waitstatus_to_exitcode(status))
+
+        try:
+            pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            pidfd = None
+
+        if pidfd is not None:
+
+            def on_exit() -> None:
+                loop.remove_reader(pidfd)
+                os.close(pidfd)
+                try:
+                    _, status = os.waitpid(pid, 0)
+                except ChildProcessError:
+                    status = 255 << 8
+                resolve(status)
+
+            loop.add_reader(pidfd, on_exit)
+            return future
+
+        def wait_blocking() -> None:
+            try:
+                _, status = os.waitpid(pid, 0)
+            except ChildProcessError:
+                status = 255 << 8
+            loop.call_soon_threadsafe(resolve, status)
+
+        threading.Thread(target=wait_blocking, daemon=True).start()
+        return future
+
+    async def spawn_exec(
+        self,
+        argv: List[str],
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        stdin: StdioSpec = asyncio.subprocess.PIPE,
+        stdout: StdioSpec = asyncio.subprocess.PIPE,
+        stderr: StdioSpec = asyncio.subprocess.PIPE,
+        start_new_session: bool = False,
+        executable: Optional[str] = None,
+    ) -> SpawnedProcess:
+        child_fds: List[int] = []
+        parent_fds: List[Optional[int]] = []
+        try:
+            for spec, for_reading in ((stdin, False), (stdout, True), (stderr, True)):
+                child_fd, parent_fd = prepare_stdio(spec, for_reading)
+                assert child_fd is not None
+                child_fds.append(child_fd)
+                parent_fds.append(parent_fd)
+
+            file_actions = [
+                (os.POSIX_SPAWN_DUP2, fd, target) for target, fd in enumerate(child_fds)
+            ]
+            pid = self._posix_spawn(
+                argv,
+                cwd,
+                dict(os.environ) if env is None else env,
+                file_actions,
+                start_new_session,
+                executable,
+            )
+        except BaseException:
+            for fd in parent_fds:
+                if fd is not None:
+                    os.close(fd)
+            raise
+        finally:
+            for fd in child_fds:
+                os.close(fd)
+
+        exit_future = self._watch_exit(pid)
+        streams = await connect_streams(*parent_fds)
+        return SpawnedProcess(pid, exit_future, *streams)
+
+
+class ForkServerLauncher(ProcessLauncher):
+    """Launches children through the fork server helper process."""
+
+    name = "forkserver"
+
+    def __init__(self):
+        self.client = ForkServerClient()
+
+    async def start(self) -> None:
+        await self.client.start()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def spawn_exec(
+        self,
+        argv: List[str],
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        stdin: StdioSpec = asyncio.subprocess.PIPE,
+        stdout: StdioSpec = asyncio.subprocess.PIPE,
+        stderr: StdioSpec = asyncio.subprocess.PIPE,
+        start_new_session: bool = False,
+        executable: Optional[str] = None,
+    ) -> SpawnedProcess:
+        return await self.client.spawn(
+            argv,
+            executable=executable,
+            cwd=cwd,
+            env=dict(os.environ) if env is None else env,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            start_new_session=start_new_session,
+        )
+
+
+LAUNCHERS: Dict[str, Type[ProcessLauncher]] = {
+    launcher.name: launcher
+    for launcher in (AsyncioLauncher, PosixSpawnLauncher, ForkServerLauncher)
+}
+
+
+def create_launcher(name: str) -> ProcessLauncher:
+    """Create a launcher by name.
+
+    Args:
+        name: One of the keys of LAUNCHERS
+
+    Returns:
+        ProcessLauncher: New launcher instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    try:
+        return LAUNCHERS[name.strip().lower()]()
+    except KeyError as e:
+        raise ValueError(f"Invalid launcher: {name}") from e
@@ -0,0 +1,227 @@
+"""Bounded capture of command output."""
+
+import codecs
+from typing import Dict, List, Optional, Tuple, Union
+
+from mcp_shell_server.output_store import OutputSpool
+
+
+class OutputCapture:
+    """
+    Keeps the first head_limit and the last tail_limit bytes written to it.
+
+    The tail is a fixed-size ring buffer, so memory use stays at
+    head_limit + tail_limit bytes however much output passes through. Bytes
+    between head and tail are only counted, unless a sink keeps the complete
+    output elsewhere.
+    """
+
+    def __init__(
+        self,
+        head_limit: Optional[int] = None,
+        tail_limit: int = 0,
+        sink: Optional[OutputSpool] = None,
+        errors: Optional[str] = None,
+    ):
+        """
+        Initialize the capture.
+
+        Args:
+            head_limit (Optional[int]): Bytes kept from the start of the output,
+                None keeps everything
+            tail_limit (int): Bytes kept from the end of the output
+            sink (Optional[OutputSpool]): Receives every byte written
+            errors (Optional[str]): Error policy for decoding the output as
+                UTF-8 while it is written, None to keep bytes only
+        """
+        if (head_limit is not None and head_limit < 0) or tail_limit < 0:
+            raise ValueError("Output limits must not be negative")
+        self.head_limit = head_limit
+        self.tail_limit = tail_limit if head_limit is not None else 0
+        self.sink = sink
+        self.errors = errors
+        self._decoder = (
+            codecs.getincrementaldecoder("utf-8")(errors) if errors else None
+        )
+        self._head_text: List[str] = []
+        self._decode_error: Optional[UnicodeDecodeError] = None
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray(self.tail_limit)
+        self._tail_len = 0
+        self._tail_pos = 0
+
+    def empty_copy(self) -> "OutputCapture":
+        """Create an empty capture with the same limits, sink and decoding."""
+        return OutputCapture(self.head_limit, self.tail_limit, self.sink, self.errors)
+
+    @property
+    def dropped_bytes(self) -> int:
+        """Number of bytes discarded between head and tail."""
+        return self.total_bytes - len(self._head) - self._tail_len
+
+    @property
+    def truncated(self) -> bool:
+        """Whether any output was discarded."""
+        return self.dropped_bytes > 0
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """
+        Add output to the capture.
+
+        Args:
+            data: Bytes read from the process
+        """
+        if self.sink is not None:
+            self.sink.write(data)
+        self._keep(data)
+
+    def _keep(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        view = memoryview(data)
+        self.total_bytes += len(view)
+        if self.head_limit is None:
+            self._head += view
+            self._decode_head(view)
+            return
+
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += view[:room]
+            self._decode_head(view[:room])
+            view = view[room:]
+        limit = self.tail_limit
+        if not view or not limit:
+            return
+
+        if len(view) >= limit:
+            self._tail[:] = view[-limit:]
+            self._tail_pos = 0
+            self._tail_len = limit
+            return
+        first = min(len(view), limit - self._tail_pos)
+        self._tail[self._tail_pos : self._tail_pos + first] = view[:first]
+        rest = len(view) - first
+        if rest:
+            self._tail[:rest] = view[first:]
+        self._tail_pos = (self._tail_pos + len(view)) % limit
+        self._tail_len = min(limit, self._tail_len + len(view))
+
+    def _decode_head(self, data: memoryview) -> None:
+        """Decode a chunk of the head as soon as it is kept."""
+        if self._decoder is None or self._decode_error is not None:
+            return
+        try:
+            self._head_text.append(self._decoder.decode(data))
+        except UnicodeDecodeError as e:
+            # Reported by gettext, reading the process output goes on
+            self._decode_error = e
+
+    def merge(self, other: "OutputCapture") -> None:
+        """
+        Append the output kept by another capture.
+
+        Bytes the other capture dropped are counted as dropped here as well.
+        Nothing is passed to the sink, captures made with empty_copy already
+        wrote to it.
+
+        Args:
+            other (OutputCapture): Capture to append
+        """
+        self._keep(other.head)
+        self._keep(other.tail)
+        self.total_bytes += other.dropped_bytes
+
+    @property
+    def head(self) -> bytes:
+        """Captured start of the output."""
+        return bytes(self._head)
+
+    @property
+    def tail(self) -> bytes:
+        """Captured end of the output."""
+        if self._tail_len < self.tail_limit:
+            return bytes(self._tail[: self._tail_len])
+        return bytes(self._tail[self._tail_pos :] + self._tail[: self._tail_pos])
+
+    def getvalue(self) -> bytes:
+        """
+        Get the captured output.
+
+        Returns:
+            bytes: Head and tail, separated by a note on the number of dropped
+                bytes when the output was truncated
+        """
+        dropped = self.dropped_bytes
+        if not dropped:
+            return self.head + self.tail
+        return self.head + _truncation_marker(dropped).encode() + self.tail
+
+    def gettext(self) -> str:
+        """
+        Get the captured output as text.
+
+        The head was decoded chunk by chunk while it was written; only the tail
+        is decoded here. A character split by the truncation is left out
+        instead of being treated as invalid output.
+
+        Returns:
+            str: Decoded head and tail, with the truncation note between them
+
+        Raises:
+            ValueError: If the capture does not decode output, or the output is
+                not valid UTF-8 under the strict policy
+        """
+        if self._decoder is None:
+            raise ValueError("Output capture does not decode output")
+        head = "".join(self._head_text)
+        tail = self.tail
+        dropped = self.dropped_bytes
+        try:
+            if self._decode_error is not None:
+                raise self._decode_error
+            if not dropped:
+                state = self._decoder.getstate()
+                try:
+                    return head + self._decoder.decode(tail, final=True)
+                finally:
+                    self._decoder.setstate(state)
+
+            # Skip the continuation bytes of a character cut at the tail start
+            start = 0
+            while start < min(3, len(tail)) and 0x80 <= tail[start] < 0xC0:
+                start += 1
+            text = tail[start:].decode("utf-8", self.errors)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Output is not valid UTF-8: {e}") from e
+        return head + _truncation_marker(dropped) + text
+
+
+def _truncation_marker(dropped: int) -> str:
+    return f"\n... [{dropped} bytes truncated] ...\n"
+
+
+def parse_output_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse per-command output limits.
+
+    Args:
+        value (str): Comma separated "command=head:tail" entries, in bytes
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Command name to (head, tail) limits
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits: Dict[str, Tuple[int, int]] = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            command, sizes = entry.split("=", 1)
+            head, tail = sizes.split(":", 1)
+            limits[command.strip()] = (int(head), int(tail))
+        except ValueError as e:
+            raise ValueError(f"Invalid output limit: {entry}") from e
+    return limits
@@ -0,0 +1,266 @@
+"""Complete command output kept for paged retrieval, spilled to disk when large."""
+
+import mmap
+import tempfile
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import IO, Dict, Optional, Tuple, Union
+
+OUTPUT_STREAMS = ("stdout", "stderr")
+
+
+class OutputSpool:
+    """
+    Append-only store for one output stream.
+
+    Output stays in memory until it grows past spill_threshold, then moves to
+    an unlinked temporary file that is read back through mmap, so ranges of a
+    huge output are served without loading it whole. The offset of every
+    newline is indexed as it is written, so line ranges are found in O(1).
+    """
+
+    def __init__(self, spill_threshold: int, directory: Optional[str] = None):
+        """
+        Initialize the spool.
+
+        Args:
+            spill_threshold (int): Bytes kept in memory before spilling to disk
+            directory (Optional[str]): Directory for the temporary file, the
+                system default if None
+        """
+        self.spill_threshold = spill_threshold
+        self.directory = directory
+        self.size = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._file: Optional[IO[bytes]] = None
+        self._map: Optional[mmap.mmap] = None
+        self._newlines = array("Q")
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the output was moved to disk."""
+        return self._file is not None
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """
+        Append output.
+
+        Args:
+            data: Bytes read from the process
+        """
+        if self.closed or not data:
+            return
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        base = self.size
+        newlines = self._newlines
+        index = data.find(b"\n")
+        while index != -1:
+            newlines.append(base + index)
+            index = data.find(b"\n", index + 1)
+        self.size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+            return
+        self._buffer += data
+        if len(self._buffer) > self.spill_threshold:
+            self._file = tempfile.TemporaryFile(dir=self.directory)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def _data(self) -> Union[bytearray, mmap.mmap]:
+        """Get the stored bytes without copying them."""
+        if self._file is None:
+            return self._buffer
+        if self._map is None or len(self._map) != self.size:
+            # The file grew since it was mapped, map it again
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, offset: int, length: int) -> bytes:
+        """
+        Read a byte range.
+
+        Args:
+            offset (int): First byte to read
+            length (int): Maximum number of bytes to read
+
+        Returns:
+            bytes: Stored bytes in the range, shorter at the end of the output
+
+        Raises:
+            ValueError: If the spool was closed
+        """
+        if self.closed:
+            raise ValueError("Output is no longer available")
+        if offset >= self.size or length <= 0:
+            return b""
+        return bytes(self._data()[offset : offset + length])
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines, counting a final line without a newline."""
+        complete = len(self._newlines)
+        last_end = self._newlines[-1] + 1 if complete else 0
+        return complete + (1 if self.size > last_end else 0)
+
+    def _line_start(self, line: int) -> int:
+        """Get the offset where a line starts, the end of the output past it."""
+        if line <= 0:
+            return 0
+        if line > len(self._newlines):
+            return self.size
+        return self._newlines[line - 1] + 1
+
+    def line_range(self, start: int, count: int) -> Tuple[int, int]:
+        """
+        Get the byte range of a range of lines.
+
+        Args:
+            start (int): Zero-based first line
+            count (int): Number of lines
+
+        Returns:
+            Tuple[int, int]: Start and end offsets of the lines
+
+        Raises:
+            ValueError: If the spool was closed
+        """
+        if self.closed:
+            raise ValueError("Output is no longer available")
+        return self._line_start(start), self._line_start(start + max(count, 0))
+
+    def tail_range(self, count: int) -> Tuple[int, int]:
+        """
+        Get the byte range of the last lines.
+
+        Args:
+            count (int): Number of lines
+
+        Returns:
+            Tuple[int, int]: Start and end offsets of the lines
+
+        Raises:
+            ValueError: If the spool was closed
+        """
+        return self.line_range(max(self.line_count - count, 0), count)
+
+    def close(self) -> None:
+        """Release the memory and the temporary file."""
+        self.closed = True
+        self._buffer = bytearray()
+        self._newlines = array("Q")
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class StoredOutput:
+    """Output of one execution, addressed by its output ID."""
+
+    def __init__(
+        self, output_id: str, spill_threshold: int, directory: Optional[str] = None
+    ):
+        self.output_id = output_id
+        self.streams: Dict[str, OutputSpool] = {
+            name: OutputSpool(spill_threshold, directory) for name in OUTPUT_STREAMS
+        }
+
+    def stream(self, name: str) -> OutputSpool:
+        """
+        Get one of the output streams.
+
+        Args:
+            name (str): "stdout" or "stderr"
+
+        Returns:
+            OutputSpool: Stored stream
+
+        Raises:
+            ValueError: If the stream name is unknown
+        """
+        spool = self.streams.get(name)
+        if spool is None:
+            raise ValueError(f"Invalid output stream: {name}")
+        return spool
+
+    def close(self) -> None:
+        """Release both streams."""
+        for spool in self.streams.values():
+            spool.close()
+
+
+class OutputStore:
+    """
+    Keeps the complete output of recent executions.
+
+    Only the most recently used max_entries outputs are kept; older ones are
+    closed and their temporary files removed.
+    """
+
+    def __init__(
+        self,
+        spill_threshold: int = 1048576,
+        max_entries: int = 32,
+        directory: Optional[str] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            spill_threshold (int): Bytes of a stream kept in memory before it
+                is spilled to disk
+            max_entries (int): Number of outputs kept
+            directory (Optional[str]): Directory for the temporary files
+        """
+        self.spill_threshold = spill_threshold
+        self.max_entries = max_entries
+        self.directory = directory
+        self._outputs: "OrderedDict[str, StoredOutput]" = OrderedDict()
+
+    def create(self) -> StoredOutput:
+        """
+        Start storing the output of a new execution.
+
+        Returns:
+            StoredOutput: Empty output with a fresh ID
+        """
+        output = StoredOutput(uuid.uuid4().hex, self.spill_threshold, self.directory)
+        self._outputs[output.output_id] = output
+        while len(self._outputs) > self.max_entries:
+            _, evicted = self._outputs.popitem(last=False)
+            evicted.close()
+        return output
+
+    def get(self, output_id: str) -> StoredOutput:
+        """
+        Get a stored output.
+
+        Args:
+            output_id (str): ID reported with the execution result
+
+        Returns:
+            StoredOutput: The stored output
+
+        Raises:
+            ValueError: If the output is unknown or was evicted
+        """
+        output = self._outputs.get(output_id)
+        if output is None:
+            raise ValueError(f"Unknown output id: {output_id}")
+        self._outputs.move_to_end(output_id)
+        return output
+
+    def close(self) -> None:
+        """Release every stored output."""
+        outputs, self._outputs = self._outputs, OrderedDict()
+        for output in outputs.values():
+            output.close()
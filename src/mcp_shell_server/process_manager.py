@@ -4,16 +4,69 @@ import asyncio
 import logging
 import os
 import signal
-from typing import IO, Any, Dict, List, Optional, Set, Tuple, Union
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from weakref import WeakSet
 
+from mcp_shell_server.config import env_float, env_int, env_str
+from mcp_shell_server.environment import EnvironmentCache
+from mcp_shell_server.jobs import JobRegistry
+from mcp_shell_server.launcher import LAUNCHERS, ProcessLauncher, create_launcher
+from mcp_shell_server.output_capture import OutputCapture
+from mcp_shell_server.shell_pool import ShellWorkerPool
+
+# Receives ("stdout" or "stderr", chunk) while a process runs
+OutputCallback = Callable[[str, bytes], Awaitable[None]]
+
 
 class ProcessManager:
     """Manages process creation, execution, and cleanup for shell commands."""
 
-    def __init__(self):
-        """Initialize ProcessManager with signal handling setup."""
+    LAUNCHERS = tuple(LAUNCHERS)
+    CAPTURE_READ_SIZE = 65536
+
+    def __init__(self, launcher: Union[str, ProcessLauncher, None] = None):
+        """Initialize ProcessManager with signal handling setup.
+
+        Args:
+            launcher: How children are spawned, a ProcessLauncher or one of
+                "asyncio", "posix_spawn" and "forkserver". Defaults to the
+                MCP_SHELL_LAUNCHER environment variable, then "asyncio".
+
+        The child environment profile is read from MCP_SHELL_ENV_PROFILE
+        ("full" or "minimal") and MCP_SHELL_ENV_ALLOWLIST, background job
+        limits from MCP_SHELL_MAX_JOBS, MCP_SHELL_JOB_RETENTION and
+        MCP_SHELL_JOB_TTL.
+        """
+        if not isinstance(launcher, ProcessLauncher):
+            launcher = create_launcher(
+                launcher or env_str("MCP_SHELL_LAUNCHER", "asyncio")
+            )
+        self.launcher = launcher
+        self.environment = EnvironmentCache(
+            profile=env_str("MCP_SHELL_ENV_PROFILE", "full"),
+            allowlist=env_str("MCP_SHELL_ENV_ALLOWLIST", "").split(","),
+        )
+        self.jobs = JobRegistry(
+            max_running=env_int("MCP_SHELL_MAX_JOBS", 32),
+            max_finished=env_int("MCP_SHELL_JOB_RETENTION", 64),
+            ttl=env_float("MCP_SHELL_JOB_TTL", 3600.0),
+        )
         self._processes: Set[asyncio.subprocess.Process] = WeakSet()
+        # Process groups led by commands and shell workers, kept until they
+        # are killed or empty so that children outliving the leader are found
+        self._process_groups: Set[int] = set()
+        self._shell_pools: Dict[str, ShellWorkerPool] = {}
         self._original_sigint_handler = None
         self._original_sigterm_handler = None
         self._setup_signal_handlers()
@@ -25,10 +78,18 @@ class ProcessManager:
 
         def handle_termination(signum: int, _: Any) -> None:
             """Handle termination signals by cleaning up processes."""
+            for pgid in list(self._process_groups):
+                try:
+                    os.killpg(pgid, signal.SIGTERM)
+                except OSError:
+                    pass
             if self._processes:
                 for process in self._processes:
                     try:
-                        if process.returncode is None:
+                        if (
+                            process.returncode is None
+                            and process.pid not in self._process_groups
+                        ):
                             process.terminate()
                     except Exception as e:
                         logging.warning(
@@ -50,6 +111,10 @@ class ProcessManager:
             signal.SIGTERM, handle_termination
         )
 
+    async def start(self) -> None:
+        """Start helper processes ahead of the first spawn."""
+        await self.launcher.start()
+
     async def start_process_async(
         self, cmd: List[str], timeout: Optional[int] = None
     ) -> asyncio.subprocess.Process:
@@ -99,10 +164,13 @@ class ProcessManager:
             if process.returncode is None:
                 try:
                     # Force kill immediately as required by tests
-                    process.kill()
+                    self._signal_command(process, signal.SIGKILL)
                     cleanup_tasks.append(asyncio.create_task(process.wait()))
                 except Exception as e:
                     logging.warning(f"Error killing process: {e}")
+            else:
+                # Children may outlive the leader that started them
+                self._signal_group(process.pid, signal.SIGKILL)
 
         if cleanup_tasks:
             try:
@@ -113,12 +181,129 @@ class ProcessManager:
             except Exception as e:
                 logging.error(f"Error during process cleanup: {e}")
 
+    def _signal_group(self, pgid: int, sig: int) -> bool:
+        """Send sig to a tracked process group.
+
+        Args:
+            pgid: Process group ID, the PID of its leader
+            sig: Signal to send
+
+        Returns:
+            bool: True if the group was tracked and still had members
+        """
+        if pgid not in self._process_groups:
+            return False
+        try:
+            os.killpg(pgid, sig)
+            return True
+        except ProcessLookupError:
+            self._process_groups.discard(pgid)
+        except OSError as e:
+            logging.warning(f"Error signalling process group {pgid}: {e}")
+        return False
+
+    def _signal_command(self, process: asyncio.subprocess.Process, sig: int) -> bool:
+        """Send sig to the process group a command leads, or to the process
+        alone when it does not lead one.
+
+        Returns:
+            bool: False if nothing was left to signal
+        """
+        if self._signal_group(process.pid, sig):
+            return True
+        if process.returncode is not None:
+            return False
+        try:
+            if sig == signal.SIGKILL:
+                process.kill()
+            else:
+                process.terminate()
+        except ProcessLookupError:
+            return False
+        return True
+
+    def _prune_process_groups(self) -> None:
+        """Forget process groups that have no members left."""
+        for pgid in list(self._process_groups):
+            self._signal_group(pgid, 0)
+
+    async def kill_process_group(
+        self, process: asyncio.subprocess.Process, grace: float = 0.5
+    ) -> None:
+        """Stop a command together with the processes it started and reap it.
+
+        Commands lead their own session, so signalling the group also reaches
+        grandchildren that killing the shell alone would leave running, even
+        after the shell itself exited. The group gets SIGTERM first so that
+        exit traps can release locks and temporary files, then SIGKILL once
+        grace seconds have passed.
+
+        Args:
+            process: Process started by create_process or create_exec_process
+            grace: Seconds between SIGTERM and SIGKILL
+        """
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            if not self._signal_command(process, sig):
+                break
+            try:
+                await asyncio.wait_for(process.wait(), timeout=grace)
+            except asyncio.TimeoutError:
+                if sig == signal.SIGKILL:
+                    logging.warning(
+                        f"Process {process.pid} was not reaped after SIGKILL"
+                    )
+        self._process_groups.discard(process.pid)
+
     async def cleanup_all(self) -> None:
         """Clean up all tracked processes."""
+        await self.jobs.cancel_all()
+        pools, self._shell_pools = self._shell_pools, {}
+        for pool in pools.values():
+            await pool.close()
+        await self.launcher.close()
         if self._processes:
             processes = list(self._processes)
             await self.cleanup_processes(processes)
             self._processes.clear()
+        # Children of commands that already finished
+        for pgid in list(self._process_groups):
+            self._signal_group(pgid, signal.SIGKILL)
+        self._process_groups.clear()
+
+    async def _spawn_command(
+        self, spawn: Awaitable[asyncio.subprocess.Process]
+    ) -> asyncio.subprocess.Process:
+        """Finish starting a command and track it.
+
+        A spawn cannot be abandoned halfway: asyncio would kill the child and
+        then wait for its pipes to close, which never happens while the
+        child's own children hold them. When the caller is cancelled the spawn
+        completes first and the whole command is then killed.
+        """
+        task = asyncio.ensure_future(spawn)
+        try:
+            process = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._kill_spawned(task))
+            raise
+
+        self._track(process)
+        return process
+
+    def _track(self, process: asyncio.subprocess.Process) -> None:
+        """Track a process that leads its own session."""
+        self._prune_process_groups()
+        self._processes.add(process)
+        self._process_groups.add(process.pid)
+
+    async def _kill_spawned(self, task: "asyncio.Future[Any]") -> None:
+        """Wait for an abandoned spawn and kill the command it started."""
+        try:
+            process = await task
+        except Exception:
+            return
+        self._track(process)
+        await self.kill_process_group(process)
 
     async def create_process(
         self,
@@ -128,6 +313,7 @@ class ProcessManager:
         stdout_handle: Any = asyncio.subprocess.PIPE,
         envs: Optional[Dict[str, str]] = None,
         timeout: Optional[int] = None,
+        stdin_handle: Any = asyncio.subprocess.PIPE,
     ) -> asyncio.subprocess.Process:
         """Create a new subprocess with the given parameters.
 
@@ -138,6 +324,7 @@ class ProcessManager:
             stdout_handle: File handle or PIPE for stdout
             envs (Optional[Dict[str, str]]): Additional environment variables
             timeout (Optional[int]): Timeout in seconds
+            stdin_handle: File descriptor or PIPE for stdin
 
         Returns:
             asyncio.subprocess.Process: Created process
@@ -146,18 +333,61 @@ class ProcessManager:
             ValueError: If process creation fails
         """
         try:
-            process = await asyncio.create_subprocess_shell(
-                shell_cmd,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=stdout_handle,
-                stderr=asyncio.subprocess.PIPE,
-                env={**os.environ, **(envs or {})},
-                cwd=directory,
+            return await self._spawn_command(
+                self.launcher.spawn_shell(
+                    shell_cmd,
+                    cwd=directory,
+                    env=self.environment.get(envs),
+                    stdin=stdin_handle,
+                    stdout=stdout_handle,
+                    start_new_session=True,
+                )
             )
 
-            # Add process to tracked set
-            self._processes.add(process)
-            return process
+        except OSError as e:
+            raise ValueError(f"Failed to create process: {str(e)}") from e
+        except Exception as e:
+            raise ValueError(
+                f"Unexpected error during process creation: {str(e)}"
+            ) from e
+
+    async def create_exec_process(
+        self,
+        argv: List[str],
+        directory: Optional[str],
+        stdout_handle: Any = asyncio.subprocess.PIPE,
+        envs: Optional[Dict[str, str]] = None,
+        executable: Optional[str] = None,
+        stdin_handle: Any = asyncio.subprocess.PIPE,
+    ) -> asyncio.subprocess.Process:
+        """Create a new subprocess by executing argv directly, without a shell.
+
+        Args:
+            argv (List[str]): Program and its arguments
+            directory (Optional[str]): Working directory
+            stdout_handle: File handle or PIPE for stdout
+            envs (Optional[Dict[str, str]]): Additional environment variables
+            executable (Optional[str]): Resolved program path, skips the PATH search
+            stdin_handle: File descriptor or PIPE for stdin
+
+        Returns:
+            asyncio.subprocess.Process: Created process
+
+        Raises:
+            ValueError: If process creation fails
+        """
+        try:
+            return await self._spawn_command(
+                self.launcher.spawn_exec(
+                    argv,
+                    cwd=directory,
+                    env=self.environment.get(envs),
+                    stdin=stdin_handle,
+                    stdout=stdout_handle,
+                    start_new_session=True,
+                    executable=executable,
+                )
+            )
 
         except OSError as e:
             raise ValueError(f"Failed to create process: {str(e)}") from e
@@ -166,78 +396,274 @@ class ProcessManager:
                 f"Unexpected error during process creation: {str(e)}"
             ) from e
 
+    async def _spawn_shell_worker(self, shell: str) -> asyncio.subprocess.Process:
+        """Start a long-lived interactive shell for the worker pool.
+
+        Args:
+            shell (str): Path of the shell to start
+
+        Returns:
+            asyncio.subprocess.Process: Shell process with piped stdio
+
+        Raises:
+            ValueError: If process creation fails
+        """
+        try:
+            process = await self.launcher.spawn_exec(
+                [shell, "-i"],
+                cwd="/",
+                env=self.environment.get(),
+                start_new_session=True,
+            )
+        except OSError as e:
+            raise ValueError(f"Failed to create process: {str(e)}") from e
+
+        self._track(process)
+        return process
+
+    def get_shell_pool(self, shell: str) -> ShellWorkerPool:
+        """Get the worker pool for a shell, creating it on first use.
+
+        Pool sizing is read from MCP_SHELL_POOL_MIN, MCP_SHELL_POOL_MAX,
+        MCP_SHELL_POOL_IDLE_TIMEOUT, MCP_SHELL_POOL_MAX_COMMANDS and
+        MCP_SHELL_POOL_HEALTH_INTERVAL.
+
+        Args:
+            shell (str): Path of the shell the workers run
+
+        Returns:
+            ShellWorkerPool: Pool of pre-warmed workers for that shell
+        """
+        pool = self._shell_pools.get(shell)
+        if pool is None:
+            pool = ShellWorkerPool(
+                lambda: self._spawn_shell_worker(shell),
+                min_size=env_int("MCP_SHELL_POOL_MIN", 1),
+                max_size=env_int("MCP_SHELL_POOL_MAX", 4),
+                idle_timeout=env_float("MCP_SHELL_POOL_IDLE_TIMEOUT", 300.0) or 300.0,
+                max_commands=env_int("MCP_SHELL_POOL_MAX_COMMANDS", 100),
+                health_check_interval=(
+                    env_float("MCP_SHELL_POOL_HEALTH_INTERVAL", 30.0) or 30.0
+                ),
+            )
+            self._shell_pools[shell] = pool
+        return pool
+
     async def execute_with_timeout(
         self,
         process: asyncio.subprocess.Process,
-        stdin: Optional[str] = None,
+        stdin: Union[str, bytes, None] = None,
         timeout: Optional[int] = None,
+        on_output: Optional[OutputCallback] = None,
+        chunk_size: int = 4096,
+        flush_interval: float = 0.1,
+        stdout_capture: Optional[OutputCapture] = None,
+        stderr_capture: Optional[OutputCapture] = None,
     ) -> Tuple[bytes, bytes]:
         """Execute the process with timeout handling.
 
         Args:
             process: Process to execute
-            stdin (Optional[str]): Input to pass to the process
+            stdin (Union[str, bytes, None]): Input to pass to the process
             timeout (Optional[int]): Timeout in seconds
+            on_output (Optional[OutputCallback]): Receives output chunks as
+                they are read instead of buffering them
+            chunk_size (int): Bytes collected before on_output is called
+            flush_interval (float): Seconds after which pending output is
+                passed to on_output even if chunk_size was not reached
+            stdout_capture (Optional[OutputCapture]): Bounds the stdout kept in
+                memory, unbounded if not given
+            stderr_capture (Optional[OutputCapture]): Bounds the stderr kept in
+                memory, unbounded if not given
 
         Returns:
-            Tuple[bytes, bytes]: Tuple of (stdout, stderr)
+            Tuple[bytes, bytes]: Tuple of (stdout, stderr), empty when streaming
 
         Raises:
             asyncio.TimeoutError: If execution times out
         """
-        stdin_bytes = stdin.encode() if stdin else None
-
-        async def _kill_process():
-            if process.returncode is not None:
-                return
-
-            try:
-                # Try graceful termination first
-                process.terminate()
-                for _ in range(5):  # Wait up to 0.5 seconds
-                    if process.returncode is not None:
-                        return
-                    await asyncio.sleep(0.1)
+        stdin_bytes = stdin.encode() if isinstance(stdin, str) else stdin
+        stdin_bytes = stdin_bytes or None
 
-                # Force kill if still running
-                if process.returncode is None:
-                    process.kill()
-                    await asyncio.wait_for(process.wait(), timeout=1.0)
-            except Exception as e:
-                logging.warning(f"Error killing process: {e}")
+        def run() -> Awaitable[Tuple[bytes, bytes]]:
+            if on_output is not None:
+                return self._stream_process(
+                    process, stdin_bytes, on_output, chunk_size, flush_interval
+                )
+            if stdout_capture is not None or stderr_capture is not None:
+                return self._capture_process(
+                    process,
+                    stdin_bytes,
+                    stdout_capture or OutputCapture(),
+                    stderr_capture or OutputCapture(),
+                )
+            return process.communicate(input=stdin_bytes)
 
         try:
             if timeout:
                 try:
-                    return await asyncio.wait_for(
-                        process.communicate(input=stdin_bytes), timeout=timeout
-                    )
+                    return await asyncio.wait_for(run(), timeout=timeout)
                 except asyncio.TimeoutError:
-                    await _kill_process()
+                    await self.kill_process_group(process)
                     raise
-            return await process.communicate(input=stdin_bytes)
+            return await run()
+        except asyncio.CancelledError:
+            # The request was cancelled or its session went away: nobody will
+            # read the output, take the whole command down. A second
+            # cancellation must not interrupt the cleanup.
+            await asyncio.shield(self.kill_process_group(process))
+            raise
         except Exception as e:
-            await _kill_process()
+            await self.kill_process_group(process)
             raise e
 
+    async def _stream_process(
+        self,
+        process: asyncio.subprocess.Process,
+        stdin_bytes: Optional[bytes],
+        on_output: OutputCallback,
+        chunk_size: int,
+        flush_interval: float,
+    ) -> Tuple[bytes, bytes]:
+        """Feed stdin and pass stdout/stderr to on_output until the process exits."""
+        await asyncio.gather(
+            self._feed_stdin(process, stdin_bytes),
+            *(
+                self._pump_stream(stream, name, on_output, chunk_size, flush_interval)
+                for name, stream in (
+                    ("stdout", process.stdout),
+                    ("stderr", process.stderr),
+                )
+                if stream is not None
+            ),
+        )
+        await process.wait()
+        return b"", b""
+
+    async def _capture_process(
+        self,
+        process: asyncio.subprocess.Process,
+        stdin_bytes: Optional[bytes],
+        stdout_capture: OutputCapture,
+        stderr_capture: OutputCapture,
+    ) -> Tuple[bytes, bytes]:
+        """Feed stdin and read stdout/stderr into bounded captures."""
+        streams = (process.stdout, process.stderr)
+        if not all(s is None or isinstance(s, asyncio.StreamReader) for s in streams):
+            # Process objects without stream readers can only communicate()
+            stdout, stderr = await process.communicate(input=stdin_bytes)
+            stdout_capture.write(stdout or b"")
+            stderr_capture.write(stderr or b"")
+        else:
+
+            async def read_into(
+                stream: Optional[asyncio.StreamReader], capture: OutputCapture
+            ) -> None:
+                while stream is not None:
+                    data = await stream.read(self.CAPTURE_READ_SIZE)
+                    if not data:
+                        return
+                    capture.write(data)
+
+            await asyncio.gather(
+                self._feed_stdin(process, stdin_bytes),
+                read_into(process.stdout, stdout_capture),
+                read_into(process.stderr, stderr_capture),
+            )
+            await process.wait()
+        return stdout_capture.getvalue(), stderr_capture.getvalue()
+
+    @staticmethod
+    async def _feed_stdin(
+        process: asyncio.subprocess.Process, stdin_bytes: Optional[bytes]
+    ) -> None:
+        """Write stdin_bytes to the process and close its stdin."""
+        if process.stdin is None:
+            return
+        try:
+            if stdin_bytes:
+                process.stdin.write(stdin_bytes)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            process.stdin.close()
+
+    @staticmethod
+    async def _pump_stream(
+        stream: asyncio.StreamReader,
+        name: str,
+        on_output: OutputCallback,
+        chunk_size: int,
+        flush_interval: float,
+    ) -> None:
+        """Read a stream to EOF, passing it to on_output in chunks.
+
+        Pending output is flushed once it reaches chunk_size bytes or has waited
+        flush_interval seconds, so slow producers still show up promptly.
+        """
+        loop = asyncio.get_running_loop()
+        pending = bytearray()
+        deadline = 0.0
+        while True:
+            data: Optional[bytes]
+            try:
+                if pending:
+                    data = await asyncio.wait_for(
+                        stream.read(chunk_size), max(0.0, deadline - loop.time())
+                    )
+                else:
+                    data = await stream.read(chunk_size)
+            except asyncio.TimeoutError:
+                data = None
+
+            if data:
+                if not pending:
+                    deadline = loop.time() + flush_interval
+                pending += data
+            if pending and (
+                not data or len(pending) >= chunk_size or loop.time() >= deadline
+            ):
+                chunk = bytes(pending)
+                pending.clear()
+                await on_output(name, chunk)
+            if data == b"":
+                return
+
     async def execute_pipeline(
         self,
-        commands: List[str],
+        commands: List[Union[str, List[str]]],
         first_stdin: Optional[bytes] = None,
         last_stdout: Union[IO[Any], int, None] = None,
         directory: Optional[str] = None,
         timeout: Optional[int] = None,
         envs: Optional[Dict[str, str]] = None,
+        on_output: Optional[OutputCallback] = None,
+        chunk_size: int = 4096,
+        flush_interval: float = 0.1,
+        stdout_capture: Optional[OutputCapture] = None,
+        stderr_capture: Optional[OutputCapture] = None,
     ) -> Tuple[bytes, bytes, int]:
         """Execute a pipeline of commands.
 
+        All stages are started together and connected with OS pipes, like a
+        shell does, so data flows between them without passing through the
+        server. Only the last stage's stdout and every stage's stderr are read.
+
         Args:
-            commands: List of shell commands to execute in pipeline
+            commands: Stages to execute, shell command strings or argv lists
             first_stdin: Input to pass to the first command
             last_stdout: Output handle for the last command
             directory: Working directory
             timeout: Timeout in seconds
             envs: Additional environment variables
+            on_output: Receives output chunks as they are read, see
+                execute_with_timeout
+            chunk_size: Bytes collected before on_output is called
+            flush_interval: Seconds before pending output is flushed
+            stdout_capture: Bounds the last stage's stdout kept in memory
+            stderr_capture: Bounds the combined stderr kept in memory; every
+                stage is captured with the same limits
 
         Returns:
             Tuple[bytes, bytes, int]: Tuple of (stdout, stderr, return_code)
@@ -249,66 +675,120 @@ class ProcessManager:
             raise ValueError("No commands provided")
 
         processes: List[asyncio.subprocess.Process] = []
+        tasks: List[asyncio.Future] = []
+        # Read end of the pipe feeding the next stage
+        pipe_read: Optional[int] = None
         try:
-            prev_stdout: Optional[bytes] = first_stdin
-            final_stderr: bytes = b""
-            final_stdout: bytes = b""
-
             for i, cmd in enumerate(commands):
-                process = await self.create_process(
-                    cmd,
-                    directory,
-                    stdout_handle=(
-                        asyncio.subprocess.PIPE
-                        if i < len(commands) - 1 or not last_stdout
-                        else last_stdout
-                    ),
-                    envs=envs,
+                stdin_handle: Any = (
+                    asyncio.subprocess.PIPE if pipe_read is None else pipe_read
                 )
+                pipe_write: Optional[int] = None
+                if i == len(commands) - 1:
+                    stdout_handle: Any = last_stdout or asyncio.subprocess.PIPE
+                else:
+                    next_read, pipe_write = os.pipe()
+                    stdout_handle = pipe_write
+                try:
+                    if isinstance(cmd, str):
+                        process = await self.create_process(
+                            cmd,
+                            directory,
+                            stdout_handle=stdout_handle,
+                            envs=envs,
+                            stdin_handle=stdin_handle,
+                        )
+                    else:
+                        process = await self.create_exec_process(
+                            cmd,
+                            directory,
+                            stdout_handle=stdout_handle,
+                            envs=envs,
+                            stdin_handle=stdin_handle,
+                        )
+                finally:
+                    # The child holds its own copies of the pipe ends now
+                    if pipe_read is not None:
+                        os.close(pipe_read)
+                        pipe_read = None
+                    if pipe_write is not None:
+                        os.close(pipe_write)
+                        pipe_read = next_read
+
                 if not hasattr(process, "is_running"):
                     process.is_running = lambda self=process: self.returncode is None  # type: ignore
                 processes.append(process)
 
-                try:
-                    stdout, stderr = await self.execute_with_timeout(
+            # Wait for every stage at once; only the first stage takes input
+            # from the server and only the last one writes output to it
+            stream_kwargs: Dict[str, Any] = (
+                {
+                    "on_output": on_output,
+                    "chunk_size": chunk_size,
+                    "flush_interval": flush_interval,
+                }
+                if on_output is not None
+                else {}
+            )
+            stage_captures: List[Dict[str, Any]] = [{} for _ in processes]
+            if on_output is None:
+                for i, captures in enumerate(stage_captures):
+                    if stderr_capture is not None:
+                        captures["stderr_capture"] = stderr_capture.empty_copy()
+                    if stdout_capture is not None and i == len(processes) - 1:
+                        captures["stdout_capture"] = stdout_capture
+            tasks = [
+                asyncio.ensure_future(
+                    self.execute_with_timeout(
                         process,
-                        stdin=prev_stdout.decode() if prev_stdout else None,
+                        stdin=first_stdin if i == 0 else None,
                         timeout=timeout,
+                        **stream_kwargs,
+                        **stage_captures[i],
                     )
-
-                    final_stderr += stderr if stderr else b""
-                    if process.returncode != 0:
-                        error_msg = stderr.decode("utf-8", errors="replace").strip()
-                        if not error_msg:
-                            error_msg = (
-                                f"Command failed with exit code {process.returncode}"
-                            )
-                        raise ValueError(error_msg)
-
-                    if i == len(commands) - 1:
-                        if last_stdout and isinstance(last_stdout, IO):
-                            last_stdout.write(stdout.decode("utf-8", errors="replace"))
-                        else:
-                            final_stdout = stdout if stdout else b""
-                    else:
-                        prev_stdout = stdout if stdout else b""
-
-                except asyncio.TimeoutError:
-                    process.kill()
-                    raise
-                except Exception:
-                    process.kill()
-                    raise
-
+                )
+                for i, process in enumerate(processes)
+            ]
+            results = await asyncio.gather(*tasks)
+
+            if stderr_capture is not None and on_output is None:
+                for captures in stage_captures:
+                    stderr_capture.merge(captures["stderr_capture"])
+                final_stderr = stderr_capture.getvalue()
+            else:
+                final_stderr = b"".join(stderr for _, stderr in results if stderr)
+            for i, process in enumerate(processes):
+                if process.returncode == 0:
+                    continue
+                # Earlier stages killed by SIGPIPE only mean a later stage
+                # stopped reading, as in `grep | head`
+                if i < len(processes) - 1 and process.returncode in (
+                    -signal.SIGPIPE,
+                    128 + signal.SIGPIPE,
+                ):
+                    continue
+                stderr = results[i][1] or b""
+                error_msg = stderr.decode("utf-8", errors="replace").strip()
+                if not error_msg:
+                    error_msg = f"Command failed with exit code {process.returncode}"
+                raise ValueError(error_msg)
+
+            final_stdout = results[-1][0] or b""
             return (
                 final_stdout,
                 final_stderr,
                 (
                     processes[-1].returncode
-                    if processes and processes[-1].returncode is not None
+                    if processes[-1].returncode is not None
                     else 1
                 ),
             )
 
         finally:
+            if pipe_read is not None:
+                os.close(pipe_read)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
             await self.cleanup_processes(processes)
@@ -0,0 +1,261 @@
+"""Weighted fair queuing across classes of work."""
+
+import heapq
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+T = TypeVar("T", bound=Hashable)
+
+
+class _Entry:
+    __slots__ = ("tag", "start", "seq", "cls", "item", "enqueued_at", "removed")
+
+    def __init__(
+        self, tag: float, start: float, seq: int, cls: str, item: Any, now: float
+    ):
+        self.tag = tag
+        self.start = start
+        self.seq = seq
+        self.cls = cls
+        self.item = item
+        self.enqueued_at = now
+        self.removed = False
+
+    def __lt__(self, other: "_Entry") -> bool:
+        return (self.tag, self.seq) < (other.tag, other.seq)
+
+
+class ClassStats:
+    """Queue latency of one class, over all and over the most recent items."""
+
+    def __init__(self, window: int = 1024):
+        self.served = 0
+        self.dropped = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, wait: float) -> None:
+        self.served += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent.append(wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))]
+
+        return {
+            "served": self.served,
+            "dropped": self.dropped,
+            "queued": self.queued,
+            "wait_mean": self.total_wait / self.served if self.served else 0.0,
+            "wait_max": self.max_wait,
+            "wait_p50": percentile(0.5),
+            "wait_p95": percentile(0.95),
+        }
+
+
+class FairScheduler(Generic[T]):
+    """
+    Orders queued items by weighted fair queuing across classes.
+
+    Every class gets a share of service proportional to its weight, however
+    many items it queues: an item's virtual finish tag advances by cost/weight
+    from the later of the class's previous tag and the current virtual time.
+    Items are served in tag order, except that an item waiting longer than
+    max_wait is served first so that a low-weight class is never starved.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1.0,
+        max_wait: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            weights (Optional[Dict[str, float]]): Weight of each class
+            default_weight (float): Weight of classes not in weights
+            max_wait (Optional[float]): Seconds after which an item is served
+                ahead of its fair turn, None to never bypass the order
+            clock (Callable[[], float]): Source of the current time
+        """
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.max_wait = max_wait or None
+        self.clock = clock
+        self.virtual_time = 0.0
+        self._finish: Dict[str, float] = {}
+        self._heap: List[_Entry] = []
+        self._arrivals: Deque[_Entry] = deque()
+        self._entries: Dict[T, _Entry] = {}
+        self._seq = 0
+        self._stats: Dict[str, ClassStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _class_stats(self, cls: str) -> ClassStats:
+        stats = self._stats.get(cls)
+        if stats is None:
+            stats = self._stats[cls] = ClassStats()
+        return stats
+
+    def push(self, cls: str, item: T, cost: float = 1.0) -> None:
+        """
+        Queue an item.
+
+        Args:
+            cls (str): Class the item is accounted to
+            item (T): Item to queue, must not already be queued
+            cost (float): Amount of service the item uses
+        """
+        weight = self.weights.get(cls, self.default_weight)
+        start = max(self.virtual_time, self._finish.get(cls, 0.0))
+        tag = self._finish[cls] = start + cost / weight
+        self._seq += 1
+        entry = _Entry(tag, start, self._seq, cls, item, self.clock())
+        heapq.heappush(self._heap, entry)
+        self._arrivals.append(entry)
+        self._entries[item] = entry
+        self._class_stats(cls).queued += 1
+
+    def _head(self) -> Optional[_Entry]:
+        """Get the entry to serve next, dropping removed entries on the way."""
+        while self._arrivals and self._arrivals[0].removed:
+            self._arrivals.popleft()
+        while self._heap and self._heap[0].removed:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        oldest = self._arrivals[0]
+        if (
+            self.max_wait is not None
+            and self.clock() - oldest.enqueued_at >= self.max_wait
+        ):
+            return oldest
+        return self._heap[0]
+
+    def peek(self) -> Optional[T]:
+        """
+        Get the item to serve next without removing it.
+
+        Returns:
+            Optional[T]: Next item, None when nothing is queued
+        """
+        entry = self._head()
+        return None if entry is None else entry.item
+
+    def pop(self) -> T:
+        """
+        Remove and return the item to serve next.
+
+        Returns:
+            T: Next item
+
+        Raises:
+            IndexError: If nothing is queued
+        """
+        entry = self._head()
+        if entry is None:
+            raise IndexError("pop from an empty scheduler")
+        self._take(entry)
+        self.virtual_time = max(self.virtual_time, entry.start)
+        # A class whose tag fell behind the virtual time starts from it anyway
+        if self._finish.get(entry.cls, 0.0) <= self.virtual_time:
+            self._finish.pop(entry.cls, None)
+        stats = self._class_stats(entry.cls)
+        stats.record(self.clock() - entry.enqueued_at)
+        return entry.item
+
+    def discard(self, item: T) -> None:
+        """
+        Remove a queued item without serving it.
+
+        Args:
+            item (T): Item to remove, ignored if it is not queued
+        """
+        entry = self._entries.get(item)
+        if entry is not None:
+            self._take(entry)
+            self._class_stats(entry.cls).dropped += 1
+
+    def _take(self, entry: _Entry) -> None:
+        # Heap and arrival queue drop the entry lazily
+        entry.removed = True
+        del self._entries[entry.item]
+        self._class_stats(entry.cls).queued -= 1
+
+    def record(self, cls: str, wait: float = 0.0) -> None:
+        """
+        Account an item that was served without being queued.
+
+        Args:
+            cls (str): Class of the item
+            wait (float): Seconds it waited
+        """
+        self._class_stats(cls).record(wait)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latency metrics of every class seen so far.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per class served and dropped counts,
+                queue length and mean, max, p50 and p95 wait in seconds
+        """
+        return {
+            cls: {
+                "weight": self.weights.get(cls, self.default_weight),
+                **stats.as_dict(),
+            }
+            for cls, stats in self._stats.items()
+        }
+
+
+def parse_class_weights(value: str) -> Dict[str, float]:
+    """
+    Parse scheduler class weights.
+
+    Args:
+        value (str): Comma separated "class=weight" entries
+
+    Returns:
+        Dict[str, float]: Class name to weight
+
+    Raises:
+        ValueError: If an entry is malformed or a weight is not positive
+    """
+    weights: Dict[str, float] = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            cls, weight = entry.split("=", 1)
+            weights[cls.strip()] = float(weight)
+        except ValueError as e:
+            raise ValueError(f"Invalid class weight: {entry}") from e
+        if weights[cls.strip()] <= 0:
+            raise ValueError(f"Invalid class weight: {entry}")
+    return weights
@@ -1,12 +1,17 @@
 import asyncio
+import base64
+import codecs
+import json
 import logging
 import traceback
 from collections.abc import Sequence
-from typing import Any
+from typing import Any, Optional
 
 from mcp.server import Server
-from mcp.types import TextContent, Tool
+from mcp.types import BlobResourceContents, EmbeddedResource, TextContent, Tool
 
+from .config import env_int, env_str
+from .jobs import Job
 from .shell_executor import ShellExecutor
 from .version import __version__
 
@@ -23,8 +28,13 @@ class ExecuteToolHandler:
     name = "shell_execute"
     description = "Execute um comando shell"
 
+    FAIR_KEYS = ("session", "directory", "priority")
+
     def __init__(self):
         self.executor = ShellExecutor()
+        self.fair_key = env_str("MCP_SHELL_FAIR_KEY", "session").lower()
+        if self.fair_key not in self.FAIR_KEYS:
+            raise ValueError(f"Chave de escalonamento inválida: {self.fair_key}")
 
     def get_allowed_commands(self) -> list[str]:
         """Obtém os comandos permitidos"""
@@ -59,17 +69,122 @@ class ExecuteToolHandler:
                         "description": "Tempo máximo de execução em segundos",
                         "minimum": 0,
                     },
+                    "stream": {
+                        "type": "boolean",
+                        "description": (
+                            "Transmite a saída por notificações de progresso/log "
+                            "durante a execução; o resultado traz apenas um resumo"
+                        ),
+                    },
+                    "chunk_size": {
+                        "type": "integer",
+                        "description": "Bytes por notificação no modo stream",
+                        "minimum": 1,
+                    },
+                    "flush_interval": {
+                        "type": "number",
+                        "description": (
+                            "Segundos até enviar uma saída parcial no modo stream"
+                        ),
+                        "minimum": 0,
+                    },
+                    "output_head_bytes": {
+                        "type": "integer",
+                        "description": (
+                            "Bytes mantidos do início de stdout e stderr; "
+                            "negativo mantém a saída inteira"
+                        ),
+                    },
+                    "output_tail_bytes": {
+                        "type": "integer",
+                        "description": "Bytes mantidos do final de stdout e stderr",
+                        "minimum": 0,
+                    },
+                    "binary": {
+                        "type": "boolean",
+                        "description": (
+                            "Retorna stdout sem conversão para texto, como "
+                            "recurso binário em base64"
+                        ),
+                    },
+                    "priority": {
+                        "type": "string",
+                        "description": (
+                            "Classe de prioridade usada pelo escalonador justo "
+                            "quando MCP_SHELL_FAIR_KEY=priority"
+                        ),
+                    },
                 },
                 "required": ["command", "directory"],
             },
         )
 
-    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+    def _create_output_notifier(self):
+        """Cria o callback que envia a saída do comando como notificações MCP.
+
+        Usa notificações de progresso quando o cliente enviou um progressToken
+        e mensagens de log caso contrário. Fora de uma requisição MCP a saída
+        é apenas descartada.
+        """
+        try:
+            ctx: Optional[Any] = app.request_context
+        except LookupError:
+            ctx = None
+        progress_token = (
+            ctx.meta.progressToken if ctx is not None and ctx.meta else None
+        )
+        decoders = {
+            name: codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for name in ("stdout", "stderr")
+        }
+        sent = {"bytes": 0}
+
+        async def on_output(name: str, data: bytes) -> None:
+            if ctx is None:
+                return
+            text = decoders[name].decode(data)
+            sent["bytes"] += len(data)
+            if progress_token is not None:
+                await ctx.session.send_progress_notification(
+                    progress_token,
+                    progress=sent["bytes"],
+                    message=text if name == "stdout" else f"[stderr] {text}",
+                    related_request_id=ctx.request_id,
+                )
+            else:
+                await ctx.session.send_log_message(
+                    level="info" if name == "stdout" else "warning",
+                    data={"stream": name, "text": text},
+                    logger=self.name,
+                    related_request_id=ctx.request_id,
+                )
+
+        return on_output
+
+    def get_tenant(self, arguments: dict) -> Optional[str]:
+        """Obtém a classe do escalonador justo para a chamada.
+
+        None deixa o executor usar o diretório de trabalho como classe.
+        """
+        if self.fair_key == "priority":
+            return str(arguments.get("priority") or "default")
+        if self.fair_key == "session":
+            try:
+                return f"session-{id(app.request_context.session):x}"
+            except LookupError:
+                return None
+        return None
+
+    async def run_tool(
+        self, arguments: dict
+    ) -> Sequence[TextContent | EmbeddedResource]:
         """Executa o comando shell com os argumentos fornecidos"""
         command = arguments.get("command", [])
         stdin = arguments.get("stdin")
         directory = arguments.get("directory", "/tmp")  # padrão para /tmp por segurança
         timeout = arguments.get("timeout")
+        stream = bool(arguments.get("stream", False))
+        binary = bool(arguments.get("binary", False))
 
         if not command:
             raise ValueError("Nenhum comando fornecido")
@@ -81,13 +196,44 @@ class ExecuteToolHandler:
         if not directory:
             raise ValueError("Diretório é obrigatório")
 
-        content: list[TextContent] = []
+        if stream and binary:
+            raise ValueError("'stream' e 'binary' não podem ser usados juntos")
+
+        content: list[TextContent | EmbeddedResource] = []
         try:
             # Trata execução com timeout
             try:
+                stream_kwargs = (
+                    {
+                        "on_output": self._create_output_notifier(),
+                        "chunk_size": arguments.get("chunk_size"),
+                        "flush_interval": arguments.get("flush_interval"),
+                    }
+                    if stream
+                    else {}
+                )
+                # Limites de saída informados na chamada têm precedência
+                execute_kwargs = {
+                    key: arguments[name]
+                    for key, name in (
+                        ("head_bytes", "output_head_bytes"),
+                        ("tail_bytes", "output_tail_bytes"),
+                    )
+                    if arguments.get(name) is not None
+                }
+                if binary:
+                    execute_kwargs["binary"] = True
+                tenant = self.get_tenant(arguments)
+                if tenant is not None:
+                    execute_kwargs["tenant"] = tenant
                 result = await asyncio.wait_for(
                     self.executor.execute(
-                        command, directory, stdin, None
+                        command,
+                        directory,
+                        stdin,
+                        None,
+                        **stream_kwargs,
+                        **execute_kwargs,
                     ),  # Passa None para timeout
                     timeout=timeout,
                 )
@@ -97,15 +243,49 @@ class ExecuteToolHandler:
             if result.get("error"):
                 raise ValueError(result["error"])
 
+            # No modo stream a saída já foi enviada, retorna apenas um resumo
+            if result.get("streamed"):
+                content.append(
+                    TextContent(
+                        type="text",
+                        text=(
+                            f"Comando finalizado com status {result.get('status')}: "
+                            f"{result['stdout_bytes']} bytes de stdout e "
+                            f"{result['stderr_bytes']} bytes de stderr transmitidos"
+                        ),
+                    )
+                )
+                return content
+
             # Adiciona stdout se presente
             if result.get("stdout"):
                 content.append(TextContent(type="text", text=result["stdout"]))
+            if result.get("stdout_data"):
+                content.append(
+                    blob_resource(
+                        f"shell-output://{result['output_id']}/stdout",
+                        result["stdout_data"],
+                    )
+                )
 
             # Adiciona stderr se presente (filtra mensagens específicas)
             stderr = result.get("stderr")
             if stderr and "cannot set terminal process group" not in stderr:
                 content.append(TextContent(type="text", text=stderr))
 
+            # A saída completa continua disponível para leitura paginada
+            if result.get("truncated"):
+                content.append(
+                    TextContent(
+                        type="text",
+                        text=(
+                            "Saída truncada; leia a saída completa com "
+                            f"shell_read_output usando output_id "
+                            f"{result['output_id']}"
+                        ),
+                    )
+                )
+
         except asyncio.TimeoutError as e:
             raise ValueError(
                 f"Tempo de execução do comando esgotado após {timeout} segundos"
@@ -114,27 +294,546 @@ class ExecuteToolHandler:
         return content
 
 
+def blob_resource(uri: str, data: bytes) -> EmbeddedResource:
+    """Cria um recurso embutido com dados binários em base64"""
+    return EmbeddedResource(
+        type="resource",
+        resource=BlobResourceContents(
+            uri=uri,
+            mimeType="application/octet-stream",
+            blob=base64.b64encode(data).decode("ascii"),
+        ),
+    )
+
+
+class ListCommandsToolHandler:
+    """Manipulador para listar os comandos permitidos e seus executáveis"""
+
+    name = "shell_list_commands"
+    description = "Lista os comandos permitidos e o caminho absoluto de cada executável"
+
+    def __init__(self, executor: ShellExecutor):
+        self.executor = executor
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta de listagem de comandos"""
+        return Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema={"type": "object", "properties": {}},
+        )
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Lista os comandos permitidos com os caminhos resolvidos"""
+        resolved = self.executor.validator.get_resolved_commands()
+        lines = [
+            f"{command}: {path or '(não encontrado no PATH)'}"
+            for command, path in resolved.items()
+        ]
+        return [TextContent(type="text", text="\n".join(lines))]
+
+
+class BatchToolHandler:
+    """Manipulador para executar vários comandos independentes em uma chamada"""
+
+    name = "shell_execute_batch"
+    description = (
+        "Executa vários comandos shell independentes simultaneamente e retorna "
+        "o resultado de cada um"
+    )
+
+    def __init__(self, execute_handler: ExecuteToolHandler):
+        self.execute_handler = execute_handler
+        self.executor = execute_handler.executor
+        self.max_items = env_int("MCP_SHELL_BATCH_MAX_ITEMS", 100)
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta de execução em lote"""
+        return Tool(
+            name=self.name,
+            description=(
+                f"{self.description}\n"
+                "Comandos permitidos: "
+                f"{', '.join(self.execute_handler.get_allowed_commands())}"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "commands": {
+                        "type": "array",
+                        "description": "Comandos a executar",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "command": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                    "description": "Comando e seus argumentos",
+                                },
+                                "directory": {
+                                    "type": "string",
+                                    "description": "Diretório de trabalho",
+                                },
+                                "stdin": {
+                                    "type": "string",
+                                    "description": "Entrada passada ao comando",
+                                },
+                                "timeout": {
+                                    "type": "integer",
+                                    "description": "Tempo máximo em segundos",
+                                    "minimum": 0,
+                                },
+                            },
+                            "required": ["command", "directory"],
+                        },
+                    },
+                    "max_parallel": {
+                        "type": "integer",
+                        "description": "Comandos executados ao mesmo tempo",
+                        "minimum": 1,
+                    },
+                    "fail_fast": {
+                        "type": "boolean",
+                        "description": (
+                            "Cancela os comandos restantes quando um deles falha"
+                        ),
+                    },
+                },
+                "required": ["commands"],
+            },
+        )
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Executa os comandos do lote e retorna os resultados em JSON"""
+        items = arguments.get("commands")
+        if not isinstance(items, list) or not items:
+            raise ValueError("'commands' deve ser um array não vazio")
+        if len(items) > self.max_items:
+            raise ValueError(f"O lote pode ter no máximo {self.max_items} comandos")
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("command"), list):
+                raise ValueError("Cada item deve ter 'command' como array")
+
+        batch = await self.executor.execute_batch(
+            items,
+            max_parallel=arguments.get("max_parallel"),
+            fail_fast=bool(arguments.get("fail_fast", False)),
+            tenant=self.execute_handler.get_tenant(arguments),
+        )
+        return [TextContent(type="text", text=json.dumps(batch, ensure_ascii=False))]
+
+
+class ReadOutputToolHandler:
+    """Manipulador para ler trechos da saída armazenada de uma execução"""
+
+    name = "shell_read_output"
+    description = (
+        "Lê um intervalo de bytes ou de linhas da saída completa de uma execução "
+        "anterior, identificada pelo output_id"
+    )
+
+    def __init__(self, executor: ShellExecutor):
+        self.executor = executor
+        self.max_bytes = env_int("MCP_SHELL_READ_OUTPUT_MAX_BYTES", 65536)
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta de leitura de saída"""
+        return Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "output_id": {
+                        "type": "string",
+                        "description": "ID da saída retornado por shell_execute",
+                    },
+                    "stream": {
+                        "type": "string",
+                        "enum": ["stdout", "stderr"],
+                        "description": "Fluxo a ler (padrão: stdout)",
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Primeiro byte a ler",
+                        "minimum": 0,
+                    },
+                    "length": {
+                        "type": "integer",
+                        "description": "Quantidade de bytes a ler",
+                        "minimum": 1,
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "description": (
+                            "Primeira linha a ler, começando em 0; "
+                            "substitui offset e length"
+                        ),
+                        "minimum": 0,
+                    },
+                    "line_count": {
+                        "type": "integer",
+                        "description": "Quantidade de linhas a ler (padrão: 100)",
+                        "minimum": 1,
+                    },
+                    "last_lines": {
+                        "type": "integer",
+                        "description": (
+                            "Lê as últimas linhas; substitui start_line, "
+                            "offset e length"
+                        ),
+                        "minimum": 1,
+                    },
+                    "binary": {
+                        "type": "boolean",
+                        "description": (
+                            "Retorna o trecho sem conversão para texto, como "
+                            "recurso binário em base64"
+                        ),
+                    },
+                },
+                "required": ["output_id"],
+            },
+        )
+
+    async def run_tool(
+        self, arguments: dict
+    ) -> Sequence[TextContent | EmbeddedResource]:
+        """Lê o intervalo pedido da saída armazenada"""
+        output_id = arguments.get("output_id")
+        if not output_id:
+            raise ValueError("output_id é obrigatório")
+        stream = arguments.get("stream") or "stdout"
+        spool = self.executor.output_store.get(output_id).stream(stream)
+
+        if arguments.get("last_lines") is not None:
+            begin, end = spool.tail_range(int(arguments["last_lines"]))
+        elif arguments.get("start_line") is not None:
+            begin, end = spool.line_range(
+                int(arguments["start_line"]), int(arguments.get("line_count") or 100)
+            )
+        else:
+            begin = int(arguments.get("offset") or 0)
+            end = begin + int(arguments.get("length") or self.max_bytes)
+        # Nunca envia mais que max_bytes em uma única resposta
+        end = min(end, begin + self.max_bytes, spool.size)
+        data = spool.read(begin, end - begin)
+
+        content: list[TextContent | EmbeddedResource] = []
+        if data and arguments.get("binary"):
+            content.append(blob_resource(f"shell-output://{output_id}/{stream}", data))
+        elif data:
+            content.append(
+                TextContent(
+                    type="text",
+                    text=data.decode("utf-8", self.executor.decode_errors),
+                )
+            )
+        content.append(
+            TextContent(
+                type="text",
+                text=(
+                    f"Bytes {begin}-{max(begin, end)} de {spool.size}, "
+                    f"{spool.line_count} linhas ({stream})"
+                ),
+            )
+        )
+        return content
+
+
+def complete_utf8_length(data: bytes) -> int:
+    """Obtém o tamanho de data sem uma sequência UTF-8 incompleta no final"""
+    for back in range(1, min(len(data), 4) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:
+            # Byte inicial: 110xxxxx, 1110xxxx e 11110xxx esperam 2, 3 e 4 bytes
+            needed = 2 if byte >> 5 == 0b110 else 3 if byte >> 4 == 0b1110 else 4
+            if byte < 0xC0 or back >= needed:
+                return len(data)
+            return len(data) - back
+    return len(data)
+
+
+class JobToolHandler:
+    """Base dos manipuladores que operam sobre um job em segundo plano"""
+
+    name = ""
+    description = ""
+
+    def __init__(self, executor: ShellExecutor):
+        self.executor = executor
+
+    def job_schema(self, **properties: Any) -> dict:
+        """Cria o schema de entrada com job_id e as propriedades extras"""
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "ID do job retornado por shell_job_start",
+                },
+                **properties,
+            },
+            "required": ["job_id"],
+        }
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta"""
+        return Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema=self.job_schema(),
+        )
+
+    def get_job_id(self, arguments: dict) -> str:
+        """Obtém o job_id obrigatório dos argumentos"""
+        job_id = arguments.get("job_id")
+        if not job_id:
+            raise ValueError("job_id é obrigatório")
+        return job_id
+
+    @staticmethod
+    def status_content(job: Job) -> Sequence[TextContent]:
+        """Retorna o estado do job em JSON"""
+        return [
+            TextContent(type="text", text=json.dumps(job.status(), ensure_ascii=False))
+        ]
+
+
+class JobStartToolHandler(JobToolHandler):
+    """Manipulador para iniciar um comando em segundo plano"""
+
+    name = "shell_job_start"
+    description = (
+        "Inicia um comando shell em segundo plano e retorna um job_id para "
+        "acompanhar, ler a saída, aguardar ou cancelar o comando"
+    )
+
+    def __init__(self, execute_handler: ExecuteToolHandler):
+        super().__init__(execute_handler.executor)
+        self.execute_handler = execute_handler
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta de início de job"""
+        schema = self.execute_handler.get_tool_description().inputSchema
+        properties = {
+            key: schema["properties"][key]
+            for key in ("command", "stdin", "directory", "timeout", "priority")
+        }
+        return Tool(
+            name=self.name,
+            description=(
+                f"{self.description}\n"
+                "Comandos permitidos: "
+                f"{', '.join(self.execute_handler.get_allowed_commands())}"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": properties,
+                "required": ["command", "directory"],
+            },
+        )
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Inicia o job e retorna seu ID"""
+        command = arguments.get("command")
+        directory = arguments.get("directory")
+        if not command:
+            raise ValueError("Nenhum comando fornecido")
+        if not isinstance(command, list):
+            raise ValueError("'command' deve ser um array")
+        if not directory:
+            raise ValueError("Diretório é obrigatório")
+
+        job = self.executor.start_job(
+            command,
+            directory,
+            stdin=arguments.get("stdin"),
+            timeout=arguments.get("timeout"),
+            tenant=self.execute_handler.get_tenant(arguments),
+        )
+        return [
+            TextContent(
+                type="text",
+                text=json.dumps({"job_id": job.job_id, "state": job.state}),
+            )
+        ]
+
+
+class JobStatusToolHandler(JobToolHandler):
+    """Manipulador para consultar o estado de um job"""
+
+    name = "shell_job_status"
+    description = (
+        "Retorna o estado de um job em segundo plano, o tamanho da saída e, "
+        "quando finalizado, o resultado da execução"
+    )
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Retorna o estado do job"""
+        job = self.executor.process_manager.jobs.get(self.get_job_id(arguments))
+        return self.status_content(job)
+
+
+class JobOutputToolHandler(JobToolHandler):
+    """Manipulador para ler a saída de um job aos poucos"""
+
+    name = "shell_job_output"
+    description = (
+        "Lê a saída de um job a partir de um offset; use next_offset na próxima "
+        "chamada para receber apenas a saída nova"
+    )
+
+    def __init__(self, executor: ShellExecutor):
+        super().__init__(executor)
+        self.max_bytes = env_int("MCP_SHELL_READ_OUTPUT_MAX_BYTES", 65536)
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta de leitura de saída do job"""
+        return Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema=self.job_schema(
+                stream={
+                    "type": "string",
+                    "enum": ["stdout", "stderr"],
+                    "description": "Fluxo a ler (padrão: stdout)",
+                },
+                offset={
+                    "type": "integer",
+                    "description": "Primeiro byte a ler (padrão: 0)",
+                    "minimum": 0,
+                },
+                length={
+                    "type": "integer",
+                    "description": "Quantidade máxima de bytes a ler",
+                    "minimum": 1,
+                },
+            ),
+        )
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Lê a saída do job a partir do offset pedido"""
+        job = self.executor.process_manager.jobs.get(self.get_job_id(arguments))
+        stream = arguments.get("stream") or "stdout"
+        spool = job.output.stream(stream)
+        running = job.state == "running"
+
+        begin = int(arguments.get("offset") or 0)
+        length = min(int(arguments.get("length") or self.max_bytes), self.max_bytes)
+        end = min(begin + length, spool.size)
+        data = spool.read(begin, end - begin)
+        # Um caractere ainda incompleto é enviado na próxima leitura
+        if running or end < spool.size:
+            data = data[: complete_utf8_length(data)]
+
+        content = []
+        if data:
+            content.append(
+                TextContent(
+                    type="text",
+                    text=data.decode("utf-8", self.executor.decode_errors),
+                )
+            )
+        content.append(
+            TextContent(
+                type="text",
+                text=json.dumps(
+                    {
+                        "offset": begin,
+                        "next_offset": begin + len(data),
+                        "size": spool.size,
+                        "state": job.state,
+                    }
+                ),
+            )
+        )
+        return content
+
+
+class JobWaitToolHandler(JobToolHandler):
+    """Manipulador para aguardar o fim de um job"""
+
+    name = "shell_job_wait"
+    description = (
+        "Aguarda até o job terminar ou o tempo limite passar e retorna seu estado"
+    )
+
+    def get_tool_description(self) -> Tool:
+        """Obtém a descrição da ferramenta de espera de job"""
+        return Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema=self.job_schema(
+                timeout={
+                    "type": "number",
+                    "description": "Segundos a aguardar (padrão: 30)",
+                    "minimum": 0,
+                }
+            ),
+        )
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Aguarda o job e retorna seu estado"""
+        timeout = arguments.get("timeout")
+        job = await self.executor.process_manager.jobs.wait(
+            self.get_job_id(arguments), 30.0 if timeout is None else float(timeout)
+        )
+        return self.status_content(job)
+
+
+class JobCancelToolHandler(JobToolHandler):
+    """Manipulador para cancelar um job"""
+
+    name = "shell_job_cancel"
+    description = "Cancela um job em segundo plano e encerra seus processos"
+
+    async def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        """Cancela o job e retorna seu estado final"""
+        job = await self.executor.process_manager.jobs.cancel(
+            self.get_job_id(arguments)
+        )
+        return self.status_content(job)
+
+
 # Inicializa manipuladores de ferramentas
 tool_handler = ExecuteToolHandler()
+tool_handlers = {
+    handler.name: handler
+    for handler in (
+        tool_handler,
+        ListCommandsToolHandler(tool_handler.executor),
+        ReadOutputToolHandler(tool_handler.executor),
+        BatchToolHandler(tool_handler),
+        JobStartToolHandler(tool_handler),
+        JobStatusToolHandler(tool_handler.executor),
+        JobOutputToolHandler(tool_handler.executor),
+        JobWaitToolHandler(tool_handler.executor),
+        JobCancelToolHandler(tool_handler.executor),
+    )
+}
 
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """Lista ferramentas disponíveis."""
-    return [tool_handler.get_tool_description()]
+    return [handler.get_tool_description() for handler in tool_handlers.values()]
 
 
 @app.call_tool()
-async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
+async def call_tool(
+    name: str, arguments: Any
+) -> Sequence[TextContent | EmbeddedResource]:
     """Manipula chamadas de ferramentas"""
     try:
-        if name != tool_handler.name:
+        handler = tool_handlers.get(name)
+        if handler is None:
             raise ValueError(f"Ferramenta desconhecida: {name}")
 
         if not isinstance(arguments, dict):
             raise ValueError("Argumentos devem ser um dicionário")
 
-        return await tool_handler.run_tool(arguments)
+        return await handler.run_tool(arguments)
 
     except Exception as e:
         logger.error(traceback.format_exc())
@@ -145,6 +844,9 @@ async def main() -> None:
     """Ponto de entrada principal para o servidor MCP shell"""
     logger.info(f"Iniciando servidor MCP shell v{__version__}")
     try:
+        # Aquece os shells antes da primeira chamada
+        await tool_handler.executor.warm_up()
+
         from mcp.server.stdio import stdio_server
 
         async with stdio_server() as (read_stream, write_stream):
@@ -154,3 +856,6 @@ async def main() -> None:
     except Exception as e:
         logger.error(f"Erro no servidor: {str(e)}")
         raise
+    finally:
+        # A sessão terminou: encerra jobs e processos que ainda executam
+        await tool_handler.executor.process_manager.cleanup_all()
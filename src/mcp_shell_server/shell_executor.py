@@ -1,16 +1,25 @@
 import asyncio
+import codecs
 import logging
 import os
 import pwd
 import shlex
 import time
-from typing import IO, Any, Dict, List, Optional, Union
+import uuid
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
+from mcp_shell_server.admission import AdmissionController
+from mcp_shell_server.command_plan import CommandPlan, CommandPlanner
 from mcp_shell_server.command_preprocessor import CommandPreProcessor
 from mcp_shell_server.command_validator import CommandValidator
+from mcp_shell_server.config import env_float, env_int, env_str
 from mcp_shell_server.directory_manager import DirectoryManager
 from mcp_shell_server.io_redirection_handler import IORedirectionHandler
-from mcp_shell_server.process_manager import ProcessManager
+from mcp_shell_server.jobs import Job
+from mcp_shell_server.output_capture import OutputCapture, parse_output_limits
+from mcp_shell_server.output_store import OutputStore, StoredOutput
+from mcp_shell_server.process_manager import OutputCallback, ProcessManager
+from mcp_shell_server.scheduler import FairScheduler, parse_class_weights
 
 
 class ShellExecutor:
@@ -18,16 +27,61 @@ class ShellExecutor:
     Executes shell commands in a secure manner by validating against a whitelist.
     """
 
-    def __init__(self, process_manager: Optional[ProcessManager] = None):
+    EXEC_MODES = ("shell", "direct", "pool")
+
+    def __init__(
+        self,
+        process_manager: Optional[ProcessManager] = None,
+        exec_mode: Optional[str] = None,
+    ):
         """
         Initialize the executor with a command validator, directory manager and IO handler.
         Args:
             process_manager: Optional ProcessManager instance for testing
+            exec_mode: Spawn mode, "shell", "direct" or "pool". Defaults to the
+                MCP_SHELL_EXEC_MODE environment variable, then "shell".
         """
+        mode = exec_mode or os.environ.get("MCP_SHELL_EXEC_MODE", "shell")
+        mode = mode.strip().lower()
+        if mode not in self.EXEC_MODES:
+            raise ValueError(f"Invalid exec mode: {mode}")
+        self.exec_mode = mode
         self.validator = CommandValidator()
         self.directory_manager = DirectoryManager()
         self.io_handler = IORedirectionHandler()
         self.preprocessor = CommandPreProcessor()
+        self.planner = CommandPlanner(self.validator)
+        self.stream_chunk_size = env_int("MCP_SHELL_STREAM_CHUNK_SIZE", 4096)
+        self.stream_flush_interval = env_float("MCP_SHELL_STREAM_FLUSH_INTERVAL", 0.1)
+        self.output_head_bytes = env_int("MCP_SHELL_OUTPUT_HEAD_BYTES", 1048576)
+        self.output_tail_bytes = env_int("MCP_SHELL_OUTPUT_TAIL_BYTES", 1048576)
+        self.output_limits = parse_output_limits(
+            os.environ.get("MCP_SHELL_OUTPUT_LIMITS", "")
+        )
+        self.decode_errors = env_str("MCP_SHELL_DECODE_ERRORS", "replace")
+        try:
+            codecs.lookup_error(self.decode_errors)
+        except LookupError as e:
+            raise ValueError(
+                f"Invalid decode errors policy: {self.decode_errors}"
+            ) from e
+        self.output_store = OutputStore(
+            spill_threshold=env_int("MCP_SHELL_OUTPUT_SPILL_BYTES", 1048576),
+            max_entries=env_int("MCP_SHELL_OUTPUT_STORE_SIZE", 32),
+            directory=env_str("MCP_SHELL_OUTPUT_DIR", "") or None,
+        )
+        self.batch_max_parallel = env_int("MCP_SHELL_BATCH_MAX_PARALLEL", 8)
+        self.admission = AdmissionController(
+            max_concurrent=env_int("MCP_SHELL_MAX_CONCURRENT", 16),
+            max_queue=env_int("MCP_SHELL_MAX_QUEUE", 256),
+            queue_timeout=env_float("MCP_SHELL_QUEUE_TIMEOUT", 60.0),
+            scheduler=FairScheduler(
+                weights=parse_class_weights(
+                    os.environ.get("MCP_SHELL_FAIR_WEIGHTS", "")
+                ),
+                max_wait=env_float("MCP_SHELL_FAIR_MAX_WAIT", 10.0),
+            ),
+        )
         self.process_manager = (
             process_manager if process_manager is not None else ProcessManager()
         )
@@ -78,6 +132,209 @@ class ShellExecutor:
         except (ImportError, KeyError):
             return os.environ.get("SHELL", "/bin/sh")
 
+    def _resolve_direct_executable(
+        self, command: List[str], envs: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """Get the executable to run when a single command can bypass the shell.
+
+        Arguments are always quoted before reaching the shell, so the only shell
+        features a plain command can depend on are builtins and aliases. Those
+        have no executable on PATH and keep going through the shell.
+
+        Returns:
+            Optional[str]: Executable path in direct mode, None to use the shell
+        """
+        if self.exec_mode != "direct" or not command:
+            return None
+        return self.validator.resolver.resolve(command[0], (envs or {}).get("PATH"))
+
+    def _pipeline_stage(
+        self, argv: List[str], envs: Optional[Dict[str, str]] = None
+    ) -> Union[str, List[str]]:
+        """Build one pipeline stage: an argv list when it can bypass the shell,
+        a shell command string otherwise."""
+        if self._resolve_direct_executable(argv, envs) is not None:
+            return self.preprocessor.create_exec_args(argv)
+        return self.preprocessor.create_shell_command(argv)
+
+    async def warm_up(self) -> None:
+        """Start helper processes and, in pool mode, the shell worker pool."""
+        await self.process_manager.start()
+        if self.exec_mode == "pool":
+            pool = self.process_manager.get_shell_pool(self._get_default_shell())
+            await pool.start()
+
+    def _stream_options(
+        self,
+        on_output: Optional[OutputCallback],
+        chunk_size: Optional[int],
+        flush_interval: Optional[float],
+        stored: StoredOutput,
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Get the streaming arguments for ProcessManager and the byte counters
+        they update; both are empty when not streaming."""
+        counts = {"stdout": 0, "stderr": 0}
+        if on_output is None:
+            return {}, counts
+
+        async def forward(name: str, data: bytes) -> None:
+            counts[name] += len(data)
+            stored.stream(name).write(data)
+            await on_output(name, data)
+
+        return {
+            "on_output": forward,
+            "chunk_size": chunk_size or self.stream_chunk_size,
+            "flush_interval": (
+                self.stream_flush_interval if flush_interval is None else flush_interval
+            ),
+        }, counts
+
+    @staticmethod
+    def _stream_summary(counts: Dict[str, int]) -> Dict[str, Any]:
+        """Result fields replacing stdout/stderr for streamed executions"""
+        return {
+            "streamed": True,
+            "stdout_bytes": counts["stdout"],
+            "stderr_bytes": counts["stderr"],
+        }
+
+    def _capture_options(
+        self,
+        program: str,
+        head_bytes: Optional[int],
+        tail_bytes: Optional[int],
+        stored: StoredOutput,
+        binary: bool = False,
+    ) -> Dict[str, OutputCapture]:
+        """Get the bounded captures for a command's stdout and stderr.
+
+        Limits given with the call win over MCP_SHELL_OUTPUT_LIMITS entries for
+        the program, which win over the global defaults. A negative head limit
+        keeps the whole output. The complete output always goes to stored.
+        Output is decoded while it is captured, except binary stdout.
+        """
+        head, tail = self.output_limits.get(
+            os.path.basename(program), (self.output_head_bytes, self.output_tail_bytes)
+        )
+        head = head if head_bytes is None else head_bytes
+        tail = tail if tail_bytes is None else tail_bytes
+        head_limit = None if head < 0 else head
+        tail_limit = max(tail, 0)
+        return {
+            f"{name}_capture": OutputCapture(
+                head_limit,
+                tail_limit,
+                spool,
+                None if binary and name == "stdout" else self.decode_errors,
+            )
+            for name, spool in stored.streams.items()
+        }
+
+    @staticmethod
+    def _capture_summary(captures: Dict[str, OutputCapture]) -> Dict[str, Any]:
+        """Result fields describing how much output the captures discarded"""
+        stdout_capture = captures["stdout_capture"]
+        stderr_capture = captures["stderr_capture"]
+        return {
+            "truncated": stdout_capture.truncated or stderr_capture.truncated,
+            "dropped_bytes": {
+                "stdout": stdout_capture.dropped_bytes,
+                "stderr": stderr_capture.dropped_bytes,
+            },
+        }
+
+    @staticmethod
+    def _stored_summary(stored: StoredOutput) -> Dict[str, Any]:
+        """Result fields locating the complete output for shell_read_output"""
+        return {
+            "output_id": stored.output_id,
+            "line_count": {
+                name: spool.line_count for name, spool in stored.streams.items()
+            },
+        }
+
+    def _output_fields(
+        self,
+        stdout: bytes,
+        stderr: bytes,
+        captures: Dict[str, OutputCapture],
+        strip: bool = True,
+    ) -> Dict[str, Any]:
+        """Get the stdout/stderr result fields.
+
+        Text comes from the captures, which decoded it while reading. A stdout
+        capture without decoding means binary mode: its bytes are returned
+        untouched as stdout_data, only the head when the output was truncated.
+
+        Raises:
+            ValueError: If the output is not valid UTF-8 under the strict policy
+        """
+        fields: Dict[str, Any] = {}
+        for name, data in (("stdout", stdout), ("stderr", stderr)):
+            capture = captures.get(f"{name}_capture")
+            if capture is not None and capture.errors is None:
+                fields[name] = ""
+                fields[f"{name}_data"] = capture.head if capture.truncated else data
+                continue
+            if capture is not None and capture.total_bytes:
+                text = capture.gettext()
+            else:
+                # Process managers that do not fill the captures
+                text = data.decode("utf-8", self.decode_errors) if data else ""
+            fields[name] = text.strip() if strip else text
+        return fields
+
+    async def _execute_on_pool(
+        self,
+        cmd: List[str],
+        directory: str,
+        timeout: Optional[int],
+        envs: Optional[Dict[str, str]],
+        start_time: float,
+        captures: Dict[str, OutputCapture],
+        stored: StoredOutput,
+    ) -> Dict[str, Any]:
+        """Run a single command on a pre-warmed shell worker."""
+        pool = self.process_manager.get_shell_pool(self._get_default_shell())
+        shell_cmd = self.preprocessor.create_shell_command(cmd)
+        try:
+            stdout, stderr, returncode = await pool.run(
+                shell_cmd, directory, envs=envs, timeout=timeout, **captures
+            )
+            output = self._output_fields(stdout, stderr, captures)
+        except asyncio.TimeoutError:
+            return {
+                "error": f"Command timed out after {timeout} seconds",
+                "status": -1,
+                "stdout": "",
+                "stderr": f"Command timed out after {timeout} seconds",
+                "execution_time": time.time() - start_time,
+                "spawn_mode": "pool",
+                **self._stored_summary(stored),
+            }
+        except ValueError as e:
+            return {
+                "error": str(e),
+                "status": 1,
+                "stdout": "",
+                "stderr": str(e),
+                "execution_time": time.time() - start_time,
+                "spawn_mode": "pool",
+            }
+
+        return {
+            "error": None,
+            **output,
+            "returncode": returncode,
+            "status": returncode,
+            "execution_time": time.time() - start_time,
+            "directory": directory,
+            "spawn_mode": "pool",
+            **self._stored_summary(stored),
+            **self._capture_summary(captures),
+        }
+
     async def execute(
         self,
         command: List[str],
@@ -85,9 +342,49 @@ class ShellExecutor:
         stdin: Optional[str] = None,
         timeout: Optional[int] = None,
         envs: Optional[Dict[str, str]] = None,
+        on_output: Optional[OutputCallback] = None,
+        chunk_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        head_bytes: Optional[int] = None,
+        tail_bytes: Optional[int] = None,
+        binary: bool = False,
+        tenant: Optional[str] = None,
+        stored: Optional[StoredOutput] = None,
     ) -> Dict[str, Any]:
+        """
+        Execute a command.
+
+        Args:
+            command (List[str]): Command and its arguments
+            directory (str): Working directory
+            stdin (Optional[str]): Input to pass to the command
+            timeout (Optional[int]): Timeout in seconds
+            envs (Optional[Dict[str, str]]): Additional environment variables
+            on_output (Optional[OutputCallback]): Streams output chunks while
+                the command runs; the result then reports byte counts in place
+                of stdout and stderr
+            chunk_size (Optional[int]): Streaming chunk size in bytes, defaults
+                to MCP_SHELL_STREAM_CHUNK_SIZE
+            flush_interval (Optional[float]): Seconds before a partial chunk is
+                streamed, defaults to MCP_SHELL_STREAM_FLUSH_INTERVAL
+            head_bytes (Optional[int]): Bytes kept from the start of each output
+                stream, defaults to MCP_SHELL_OUTPUT_LIMITS or
+                MCP_SHELL_OUTPUT_HEAD_BYTES
+            tail_bytes (Optional[int]): Bytes kept from the end of each output
+                stream, defaults to MCP_SHELL_OUTPUT_LIMITS or
+                MCP_SHELL_OUTPUT_TAIL_BYTES
+            binary (bool): Return stdout as raw bytes in stdout_data instead of
+                decoding it
+            tenant (Optional[str]): Class the fair scheduler accounts the
+                command to while it waits for a slot, defaults to directory
+            stored (Optional[StoredOutput]): Receives the complete output,
+                defaults to a new entry of the output store
+
+        Returns:
+            Dict[str, Any]: Execution result; execution_time excludes the
+                queue_wait_time spent waiting for the admission controller
+        """
         start_time = time.time()
-        process = None  # Initialize process variable
 
         try:
             # Validate directory if specified
@@ -102,85 +399,261 @@ class ShellExecutor:
                     "execution_time": time.time() - start_time,
                 }
 
-            # Process command
-            preprocessed_command = self.preprocessor.preprocess_command(command)
-            cleaned_command = self.preprocessor.clean_command(preprocessed_command)
-            if not cleaned_command:
+            # Compile the command, repeated commands reuse the cached plan
+            plan = self.planner.plan(command)
+            if plan.error:
                 return {
-                    "error": "Empty command",
+                    "error": plan.error,
                     "status": 1,
                     "stdout": "",
-                    "stderr": "Empty command",
+                    "stderr": plan.error,
                     "execution_time": time.time() - start_time,
                 }
 
-            # First check for pipe operators and handle pipeline
-            if "|" in cleaned_command:
-                try:
-                    # Validate pipeline first using the validator
-                    try:
-                        self.validator.validate_pipeline(cleaned_command)
-                    except ValueError as e:
-                        return {
-                            "error": str(e),
-                            "status": 1,
-                            "stdout": "",
-                            "stderr": str(e),
-                            "execution_time": time.time() - start_time,
-                        }
-
-                    # Split commands
-                    commands = self.preprocessor.split_pipe_commands(cleaned_command)
-                    if not commands:
-                        raise ValueError("Empty command before pipe operator")
-
-                    return await self._execute_pipeline(
-                        commands, directory, timeout, envs
-                    )
-                except ValueError as e:
-                    return {
-                        "error": str(e),
-                        "status": 1,
-                        "stdout": "",
-                        "stderr": str(e),
-                        "execution_time": time.time() - start_time,
-                    }
+            # The complete output is stored for shell_read_output under this ID
+            if stored is None:
+                stored = self.output_store.create()
+            stream_kwargs, stream_counts = self._stream_options(
+                on_output, chunk_size, flush_interval, stored
+            )
 
-            # Then check for other shell operators
-            for token in cleaned_command:
-                try:
-                    self.validator.validate_no_shell_operators(token)
-                except ValueError as e:
-                    return {
-                        "error": str(e),
-                        "status": 1,
-                        "stdout": "",
-                        "stderr": str(e),
-                        "execution_time": time.time() - start_time,
-                    }
+            # Streamed output is never buffered, so only bound what is kept
+            captures = (
+                {}
+                if stream_kwargs
+                else self._capture_options(
+                    plan.stages[-1].argv[0], head_bytes, tail_bytes, stored, binary
+                )
+            )
 
-            # Single command execution
+            # Wait for a free slot, one per process the command spawns
             try:
-                cmd, redirects = self.preprocessor.parse_command(cleaned_command)
+                queue_wait_time = await self.admission.acquire(
+                    len(plan.stages), tenant or directory
+                )
             except ValueError as e:
                 return {
                     "error": str(e),
                     "status": 1,
                     "stdout": "",
                     "stderr": str(e),
-                    "execution_time": time.time() - start_time,
+                    "execution_time": 0.0,
+                    "queue_wait_time": time.time() - start_time,
                 }
+            try:
+                result = await self._execute_plan(
+                    plan,
+                    directory,
+                    stdin,
+                    timeout,
+                    envs,
+                    stream_kwargs,
+                    stream_counts,
+                    captures,
+                    stored,
+                )
+            finally:
+                self.admission.release(len(plan.stages))
+            result["queue_wait_time"] = queue_wait_time
+            return result
+
+        except ValueError as e:
+            return {
+                "error": str(e),
+                "status": 1,
+                "stdout": "",
+                "stderr": str(e),
+                "execution_time": time.time() - start_time,
+            }
 
+    def start_job(
+        self,
+        command: List[str],
+        directory: str,
+        stdin: Optional[str] = None,
+        timeout: Optional[int] = None,
+        envs: Optional[Dict[str, str]] = None,
+        tenant: Optional[str] = None,
+    ) -> Job:
+        """
+        Start a command in the background.
+
+        The job owns its output instead of the output store, so it can be read
+        while the command runs and is not evicted before the job is dropped.
+        Nothing is kept in memory besides it.
+
+        Args:
+            command (List[str]): Command and its arguments
+            directory (str): Working directory
+            stdin (Optional[str]): Input to pass to the command
+            timeout (Optional[int]): Timeout in seconds
+            envs (Optional[Dict[str, str]]): Additional environment variables
+            tenant (Optional[str]): Fair scheduler class of the command
+
+        Returns:
+            Job: The running job
+
+        Raises:
+            ValueError: If too many jobs are already running
+        """
+        output = StoredOutput(
+            uuid.uuid4().hex,
+            self.output_store.spill_threshold,
+            self.output_store.directory,
+        )
+        job = Job(output.output_id, command, directory, output)
+        try:
+            self.process_manager.jobs.add(job)
+        except ValueError:
+            output.close()
+            raise
+
+        async def run() -> None:
             try:
-                self.validator.validate_command(cmd)
-            except ValueError as e:
-                return {
-                    "error": str(e),
+                result = await self.execute(
+                    command,
+                    directory,
+                    stdin=stdin,
+                    timeout=timeout,
+                    envs=envs,
+                    head_bytes=0,
+                    tail_bytes=0,
+                    tenant=tenant,
+                    stored=output,
+                )
+            except asyncio.CancelledError:
+                job.finish("cancelled")
+                raise
+            except Exception as e:
+                logging.exception("Background job %s failed", job.job_id)
+                job.finish("failed", {"error": str(e), "status": 1})
+                return
+            failed = result.get("error") or result.get("status")
+            job.finish("failed" if failed else "succeeded", result)
+
+        job.task = asyncio.create_task(run())
+        return job
+
+    async def execute_batch(
+        self,
+        items: List[Dict[str, Any]],
+        max_parallel: Optional[int] = None,
+        fail_fast: bool = False,
+        tenant: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute independent commands concurrently.
+
+        Args:
+            items (List[Dict[str, Any]]): Commands to run, each with "command",
+                "directory" and optional "stdin" and "timeout"
+            max_parallel (Optional[int]): Commands running at once, capped by
+                MCP_SHELL_BATCH_MAX_PARALLEL
+            fail_fast (bool): Cancel the remaining commands once one fails
+            tenant (Optional[str]): Fair scheduler class of every command
+
+        Returns:
+            Dict[str, Any]: Per item results in input order, each with its
+                index, plus counts of succeeded, failed and skipped items,
+                the wall time of the batch and the summed execution time
+        """
+        start_time = time.time()
+        limit = min(max_parallel or self.batch_max_parallel, self.batch_max_parallel)
+        semaphore = asyncio.Semaphore(max(limit, 1))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        tasks: List[asyncio.Task] = []
+
+        async def run(index: int, item: Dict[str, Any]) -> None:
+            async with semaphore:
+                result = await self.execute(
+                    item.get("command") or [],
+                    item.get("directory"),
+                    stdin=item.get("stdin"),
+                    timeout=item.get("timeout"),
+                    tenant=tenant,
+                )
+            results[index] = result
+            if fail_fast and (result.get("error") or result.get("status")):
+                for task in tasks:
+                    if task is not asyncio.current_task():
+                        task.cancel()
+
+        tasks.extend(
+            asyncio.create_task(run(index, item)) for index, item in enumerate(items)
+        )
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        succeeded = failed = skipped = 0
+        items_results = []
+        for index, result in enumerate(results):
+            if result is None and isinstance(outcomes[index], Exception):
+                failed += 1
+                result = {
+                    "error": str(outcomes[index]),
                     "status": 1,
                     "stdout": "",
-                    "stderr": str(e),
-                    "execution_time": time.time() - start_time,
+                    "stderr": str(outcomes[index]),
+                    "execution_time": 0.0,
                 }
+            elif result is None:
+                skipped += 1
+                message = "Skipped after an earlier command failed"
+                result = {
+                    "error": message,
+                    "status": -1,
+                    "stdout": "",
+                    "stderr": message,
+                    "execution_time": 0.0,
+                    "skipped": True,
+                }
+            elif result.get("error") or result.get("status"):
+                failed += 1
+            else:
+                succeeded += 1
+            items_results.append({"index": index, **result})
+
+        return {
+            "results": items_results,
+            "succeeded": succeeded,
+            "failed": failed,
+            "skipped": skipped,
+            "wall_time": time.time() - start_time,
+            "total_execution_time": sum(
+                result.get("execution_time", 0.0) for result in items_results
+            ),
+        }
+
+    async def _execute_plan(
+        self,
+        plan: CommandPlan,
+        directory: str,
+        stdin: Optional[str],
+        timeout: Optional[int],
+        envs: Optional[Dict[str, str]],
+        stream_kwargs: Dict[str, Any],
+        stream_counts: Dict[str, int],
+        captures: Dict[str, OutputCapture],
+        stored: StoredOutput,
+    ) -> Dict[str, Any]:
+        """Run a validated plan once the admission controller let it through."""
+        start_time = time.time()
+        process = None  # Initialize process variable
+
+        try:
+            if plan.is_pipeline:
+                return await self._execute_pipeline(
+                    plan,
+                    directory,
+                    timeout,
+                    envs,
+                    stream_kwargs,
+                    stream_counts,
+                    captures,
+                    stored,
+                )
+
+            stage = plan.stages[0]
+            cmd = list(stage.argv)
 
             # Directory validation
             if directory:
@@ -200,18 +673,15 @@ class ShellExecutor:
                         "stderr": f"Not a directory: {directory}",
                         "execution_time": time.time() - start_time,
                     }
-            if not cleaned_command:
-                raise ValueError("Empty command")
 
             # Initialize stdout_handle with default value
             stdout_handle: Union[IO[Any], int] = asyncio.subprocess.PIPE
 
             try:
-                # Process redirections
-                cmd, redirects = self.io_handler.process_redirections(cleaned_command)
-
                 # Setup handles for redirection
-                handles = await self.io_handler.setup_redirects(redirects, directory)
+                handles = await self.io_handler.setup_redirects(
+                    stage.redirects.as_dict(), directory
+                )
 
                 # Get stdin and stdout from handles if present
                 stdin_data = handles.get("stdin_data")
@@ -232,14 +702,40 @@ class ShellExecutor:
                     "execution_time": time.time() - start_time,
                 }
 
-            # Execute the command with interactive shell
-            shell = self._get_default_shell()
-            shell_cmd = self.preprocessor.create_shell_command(cmd)
-            shell_cmd = f"{shell} -i -c {shlex.quote(shell_cmd)}"
+            # Pooled workers cannot take stdin, file redirections or stream
+            # output, those commands are spawned as usual
+            if (
+                self.exec_mode == "pool"
+                and not stdin
+                and stdout_handle is asyncio.subprocess.PIPE
+                and not stream_kwargs
+            ):
+                return await self._execute_on_pool(
+                    cmd, directory, timeout, envs, start_time, captures, stored
+                )
 
-            process = await self.process_manager.create_process(
-                shell_cmd, directory, stdout_handle=stdout_handle, envs=envs
-            )
+            executable = self._resolve_direct_executable(cmd, envs)
+            if executable is not None:
+                # Execute the argv directly, skipping the shell entirely
+                spawn_mode = "direct"
+                process = await self.process_manager.create_exec_process(
+                    self.preprocessor.create_exec_args(cmd),
+                    directory,
+                    stdout_handle=stdout_handle,
+                    envs=envs,
+                    executable=executable,
+                )
+            else:
+                # Execute the command with interactive shell
+                spawn_mode = "shell"
+                shell = self._get_default_shell()
+                shell_cmd = self.preprocessor.create_shell_command(cmd)
+                shell_cmd = f"{shell} -i -c {shlex.quote(shell_cmd)}"
+
+                process = await self.process_manager.create_process(
+                    shell_cmd, directory, stdout_handle=stdout_handle, envs=envs
+                )
+            logging.debug(f"Spawned {cmd[0]} via {spawn_mode} path")
 
             try:
                 # Send input if provided
@@ -256,11 +752,14 @@ class ShellExecutor:
                         raise e
 
                 try:
-                    # プロセス通信実行
-                    stdout, stderr = await asyncio.shield(
-                        self.process_manager.execute_with_timeout(
-                            process, stdin=stdin, timeout=timeout
-                        )
+                    # プロセス通信実行; cancelling the request reaches the
+                    # process manager, which kills the command
+                    stdout, stderr = await self.process_manager.execute_with_timeout(
+                        process,
+                        stdin=stdin,
+                        timeout=timeout,
+                        **stream_kwargs,
+                        **captures,
                     )
 
                     # ファイルハンドル処理
@@ -275,25 +774,27 @@ class ShellExecutor:
                         0 if process.returncode is None else process.returncode
                     )
 
-                    return {
+                    result = {
                         "error": None,
-                        "stdout": stdout.decode().strip() if stdout else "",
-                        "stderr": stderr.decode().strip() if stderr else "",
+                        **self._output_fields(stdout, stderr, captures),
                         "returncode": final_returncode,
                         "status": process.returncode,
                         "execution_time": time.time() - start_time,
                         "directory": directory,
+                        "spawn_mode": spawn_mode,
+                        **self._stored_summary(stored),
+                        **(self._capture_summary(captures) if captures else {}),
                     }
+                    if stream_kwargs:
+                        result.update(self._stream_summary(stream_counts))
+                    return result
 
                 except asyncio.TimeoutError:
                     # タイムアウト時のプロセスクリーンアップ
                     if process and process.returncode is None:
-                        try:
-                            process.kill()
-                            await asyncio.shield(process.wait())
-                        except ProcessLookupError:
-                            # Process already terminated
-                            pass
+                        await asyncio.shield(
+                            self.process_manager.kill_process_group(process)
+                        )
 
                     # ファイルハンドルクリーンアップ
                     if isinstance(stdout_handle, IO):
@@ -305,6 +806,8 @@ class ShellExecutor:
                         "stdout": "",
                         "stderr": f"Command timed out after {timeout} seconds",
                         "execution_time": time.time() - start_time,
+                        "spawn_mode": spawn_mode,
+                        **self._stored_summary(stored),
                     }
 
             except Exception as e:  # Exception handler for subprocess
@@ -320,39 +823,33 @@ class ShellExecutor:
 
         finally:
             if process and process.returncode is None:
-                process.kill()
-                await process.wait()
+                await asyncio.shield(self.process_manager.kill_process_group(process))
 
     async def _execute_pipeline(
         self,
-        commands: List[List[str]],
+        plan: CommandPlan,
         directory: Optional[str] = None,
         timeout: Optional[int] = None,
         envs: Optional[Dict[str, str]] = None,
+        stream_kwargs: Optional[Dict[str, Any]] = None,
+        stream_counts: Optional[Dict[str, int]] = None,
+        captures: Optional[Dict[str, OutputCapture]] = None,
+        stored: Optional[StoredOutput] = None,
     ) -> Dict[str, Any]:
         start_time = time.time()
+        stream_kwargs = stream_kwargs or {}
+        captures = captures or {}
         try:
-            # Validate all commands before execution
-            for cmd in commands:
-                # Make sure each command is allowed
-                self.validator.validate_command(cmd)
-
             # Initialize IO variables
-            parsed_commands = []
+            stages = [
+                self._pipeline_stage(list(stage.argv), envs) for stage in plan.stages
+            ]
             first_stdin: Optional[bytes] = None
             pipeline_stdout: Union[IO[Any], int, None] = None
-            first_redirects = None
-            last_redirects = None
-
-            # Process redirections for all commands
-            for i, command in enumerate(commands):
-                cmd, redirects = self.io_handler.process_redirections(command)
-                parsed_commands.append(cmd)
-
-                if i == 0:  # First command
-                    first_redirects = redirects
-                elif i == len(commands) - 1:  # Last command
-                    last_redirects = redirects
+            first_redirects = plan.stages[0].redirects.as_dict()
+            last_redirects = (
+                plan.stages[-1].redirects.as_dict() if len(plan.stages) > 1 else None
+            )
 
             # Setup first and last command redirections
             if first_redirects:
@@ -376,28 +873,39 @@ class ShellExecutor:
 
             # Execute pipeline
             try:
-                stdout, stderr, returncode = (
-                    await self.process_manager.execute_pipeline(
-                        [command[0] for command in parsed_commands],
-                        first_stdin=first_stdin,
-                        last_stdout=pipeline_stdout,
-                        directory=directory,
-                        timeout=timeout,
-                        envs=envs,
-                    )
+                (
+                    stdout,
+                    stderr,
+                    returncode,
+                ) = await self.process_manager.execute_pipeline(
+                    stages,
+                    first_stdin=first_stdin,
+                    last_stdout=pipeline_stdout,
+                    directory=directory,
+                    timeout=timeout,
+                    envs=envs,
+                    **stream_kwargs,
+                    **captures,
                 )
 
-                final_output = stdout.decode("utf-8") if stdout else ""
-                final_stderr = stderr.decode("utf-8") if stderr else ""
-
-                return {
+                result = {
                     "error": None,
-                    "stdout": final_output,
-                    "stderr": final_stderr,
+                    **self._output_fields(stdout, stderr, captures, strip=False),
                     "status": returncode,
                     "execution_time": time.time() - start_time,
                     "directory": directory,
+                    "spawn_mode": (
+                        "direct"
+                        if all(isinstance(stage, list) for stage in stages)
+                        else "shell"
+                    ),
+                    **(self._capture_summary(captures) if captures else {}),
                 }
+                if stored is not None:
+                    result.update(self._stored_summary(stored))
+                if stream_kwargs and stream_counts is not None:
+                    result.update(self._stream_summary(stream_counts))
+                return result
 
             except Exception as e:
                 await self.process_manager.cleanup_processes([])
@@ -0,0 +1,437 @@
+"""Pool of pre-warmed, long-lived shell workers."""
+
+import asyncio
+import logging
+import os
+import re
+import secrets
+import shlex
+import signal
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from mcp_shell_server.output_capture import OutputCapture
+
+_ENV_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_READ_CHUNK_SIZE = 65536
+
+
+class ShellWorker:
+    """A persistent shell process that runs commands sent over its stdin.
+
+    Each command is framed between sentinel markers: after the command runs,
+    the worker prints a per-command marker followed by the exit code on both
+    stdout and stderr, which delimits the output of that command.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        """Initialize the worker around an already started shell process.
+
+        Args:
+            process: Shell process with piped stdin, stdout and stderr
+        """
+        self.process = process
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.commands_run = 0
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the underlying shell process is still running."""
+        return self.process.returncode is None
+
+    @staticmethod
+    def _new_marker() -> bytes:
+        return f"__MCP_SHELL_WORKER_{secrets.token_hex(8)}__".encode()
+
+    @staticmethod
+    async def _read_until_marker(
+        stream: asyncio.StreamReader, marker: bytes, capture: OutputCapture
+    ) -> int:
+        """Read from stream into capture until the marker line, return the exit code.
+
+        Only a possible partial marker is held back, everything before it goes
+        to the capture as it is read.
+        """
+        buffer = bytearray()
+        while True:
+            index = buffer.find(marker)
+            if index != -1:
+                capture.write(buffer[:index])
+                del buffer[:index]
+                end = buffer.find(b"\n")
+                if end != -1:
+                    code = buffer[len(marker) : end].strip()
+                    return int(code or 0)
+            else:
+                keep = len(marker) - 1
+                if len(buffer) > keep:
+                    capture.write(buffer[: len(buffer) - keep])
+                    del buffer[: len(buffer) - keep]
+
+            chunk = await stream.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("Shell worker exited unexpectedly")
+            buffer += chunk
+
+    async def _send(
+        self,
+        script: str,
+        marker: bytes,
+        stdout_capture: Optional[OutputCapture] = None,
+        stderr_capture: Optional[OutputCapture] = None,
+    ) -> Tuple[bytes, bytes, int]:
+        """Send a framed script to the shell and collect its output."""
+        if not self.is_alive:
+            raise ValueError("Shell worker is not running")
+
+        # The marker is split in the script so an echoed frame never matches
+        head, tail = marker[:8].decode(), marker[8:].decode()
+        frame = (
+            f"{script}\n"
+            f"__mcp_rc=$?\n"
+            f"printf '%s%s %d\\n' '{head}' '{tail}' \"$__mcp_rc\"\n"
+            f"printf '%s%s %d\\n' '{head}' '{tail}' \"$__mcp_rc\" >&2\n"
+        )
+        assert self.process.stdin is not None
+        assert self.process.stdout is not None
+        assert self.process.stderr is not None
+
+        self.process.stdin.write(frame.encode())
+        await self.process.stdin.drain()
+        stdout_capture = stdout_capture or OutputCapture()
+        stderr_capture = stderr_capture or OutputCapture()
+        returncode, _ = await asyncio.gather(
+            self._read_until_marker(self.process.stdout, marker, stdout_capture),
+            self._read_until_marker(self.process.stderr, marker, stderr_capture),
+        )
+        return stdout_capture.getvalue(), stderr_capture.getvalue(), returncode
+
+    async def initialize(self, timeout: float = 10.0) -> None:
+        """Silence prompts and wait until the shell finished its startup files.
+
+        Args:
+            timeout: Maximum time to wait for the shell to become ready
+
+        Raises:
+            asyncio.TimeoutError: If the shell does not become ready in time
+        """
+        # Line editing echoes every frame to stderr, switch it off first
+        script = (
+            "set +o emacs +o vi 2>/dev/null; "
+            "PS1=''; PS2=''; PS4=''; unset PROMPT_COMMAND HISTFILE"
+        )
+        await asyncio.wait_for(self._send(script, self._new_marker()), timeout)
+
+    async def run(
+        self,
+        script: str,
+        timeout: Optional[float] = None,
+        stdout_capture: Optional[OutputCapture] = None,
+        stderr_capture: Optional[OutputCapture] = None,
+    ) -> Tuple[bytes, bytes, int]:
+        """Run a shell script in the worker.
+
+        Args:
+            script: Shell script to run; must not read from the worker's stdin
+            timeout: Optional timeout in seconds
+            stdout_capture: Optional bounded capture for stdout
+            stderr_capture: Optional bounded capture for stderr
+
+        Returns:
+            Tuple[bytes, bytes, int]: Tuple of (stdout, stderr, return_code)
+
+        Raises:
+            asyncio.TimeoutError: If the command does not finish in time
+            ValueError: If the worker dies while running the command
+        """
+        self.commands_run += 1
+        try:
+            return await asyncio.wait_for(
+                self._send(script, self._new_marker(), stdout_capture, stderr_capture),
+                timeout=timeout or None,
+            )
+        finally:
+            self.last_used = time.monotonic()
+
+    async def ping(self, timeout: float = 2.0) -> bool:
+        """Check that the worker still answers commands.
+
+        Args:
+            timeout: Maximum time to wait for the answer
+
+        Returns:
+            bool: True if the worker is healthy
+        """
+        try:
+            _, _, returncode = await asyncio.wait_for(
+                self._send(":", self._new_marker()), timeout
+            )
+            return returncode == 0
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        """Terminate the worker process."""
+        if self.process.returncode is not None:
+            return
+        try:
+            if self.process.stdin is not None:
+                self.process.stdin.close()
+            try:
+                # Workers lead their own session, take running commands down too
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                self.process.kill()
+            await asyncio.wait_for(self.process.wait(), timeout=1.0)
+        except Exception as e:
+            logging.warning(f"Error closing shell worker: {e}")
+
+
+class ShellWorkerPool:
+    """Keeps a set of initialised shell workers ready to run commands."""
+
+    def __init__(
+        self,
+        spawn: Callable[[], Awaitable[asyncio.subprocess.Process]],
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        max_commands: int = 100,
+        health_check_interval: float = 30.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            spawn: Coroutine factory starting a new shell process
+            min_size: Number of workers kept warm at all times
+            max_size: Maximum number of concurrent workers
+            idle_timeout: Seconds after which idle workers above min_size are evicted
+            max_commands: Number of commands after which a worker is recycled
+            health_check_interval: Idle seconds after which a worker is pinged
+                before being handed out
+        """
+        if max_size < 1:
+            raise ValueError("Shell pool max size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("Shell pool min size must be between 0 and max size")
+        self._spawn = spawn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_commands = max_commands
+        self.health_check_interval = health_check_interval
+        self._idle: List[ShellWorker] = []
+        self._size = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Number of live workers, busy or idle."""
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        """Number of workers waiting for a command."""
+        return len(self._idle)
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _new_worker(self) -> ShellWorker:
+        worker = ShellWorker(await self._spawn())
+        try:
+            await worker.initialize()
+        except BaseException:
+            await worker.close()
+            raise
+        return worker
+
+    async def start(self) -> None:
+        """Spawn workers until min_size workers are warm."""
+        self._ensure_maintenance()
+        while self._size < self.min_size and not self._closed:
+            self._size += 1
+            try:
+                worker = await self._new_worker()
+            except BaseException:
+                self._size -= 1
+                raise
+            self._idle.append(worker)
+
+    def _ensure_maintenance(self) -> None:
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintain())
+
+    async def _maintain(self) -> None:
+        """Periodically evict idle workers above min_size."""
+        interval = max(min(self.idle_timeout / 2, 30.0), 0.05)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for worker in list(self._idle):
+                if self._size <= self.min_size:
+                    break
+                if now - worker.last_used >= self.idle_timeout:
+                    self._idle.remove(worker)
+                    await self._discard(worker)
+
+    async def _discard(self, worker: ShellWorker) -> None:
+        self._size -= 1
+        await worker.close()
+        condition = self._get_condition()
+        async with condition:
+            condition.notify()
+        if self._size < self.min_size and not self._closed:
+            asyncio.create_task(self._replenish())
+
+    async def _replenish(self) -> None:
+        """Bring the pool back to min_size in the background."""
+        try:
+            await self.start()
+        except Exception as e:
+            logging.warning(f"Error starting shell worker: {e}")
+
+    async def acquire(self) -> ShellWorker:
+        """Get a healthy worker, spawning one if the pool is below max_size.
+
+        Returns:
+            ShellWorker: Worker reserved for the caller
+
+        Raises:
+            ValueError: If the pool has been closed
+        """
+        self._ensure_maintenance()
+        condition = self._get_condition()
+        while True:
+            if self._closed:
+                raise ValueError("Shell pool is closed")
+
+            while self._idle:
+                worker = self._idle.pop()
+                idle_for = time.monotonic() - worker.last_used
+                healthy = worker.is_alive and (
+                    idle_for < self.health_check_interval or await worker.ping()
+                )
+                if healthy:
+                    return worker
+                await self._discard(worker)
+
+            if self._size < self.max_size:
+                self._size += 1
+                try:
+                    return await self._new_worker()
+                except BaseException:
+                    self._size -= 1
+                    raise
+
+            async with condition:
+                await condition.wait()
+
+    async def release(self, worker: ShellWorker) -> None:
+        """Return a worker to the pool, recycling it if it is worn out or dead.
+
+        Args:
+            worker: Worker previously obtained from acquire()
+        """
+        if (
+            self._closed
+            or not worker.is_alive
+            or worker.commands_run >= self.max_commands
+        ):
+            await self._discard(worker)
+            return
+
+        self._idle.append(worker)
+        condition = self._get_condition()
+        async with condition:
+            condition.notify()
+
+    @staticmethod
+    def build_script(
+        command: str,
+        directory: Optional[str] = None,
+        envs: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Wrap a shell command so it runs isolated inside a subshell.
+
+        Args:
+            command: Already quoted shell command
+            directory: Working directory for the command
+            envs: Additional environment variables
+
+        Returns:
+            str: Script suitable for ShellWorker.run
+
+        Raises:
+            ValueError: If an environment variable name is not a valid identifier
+        """
+        steps = []
+        if directory:
+            steps.append(f"cd -- {shlex.quote(directory)}")
+        if envs:
+            for name in envs:
+                if not _ENV_NAME_PATTERN.match(name):
+                    raise ValueError(f"Invalid environment variable name: {name}")
+            exports = " ".join(
+                f"{name}={shlex.quote(value)}" for name, value in envs.items()
+            )
+            steps.append(f"export {exports}")
+        steps.append(command)
+        return f"({' && '.join(steps)}) </dev/null"
+
+    async def run(
+        self,
+        command: str,
+        directory: Optional[str] = None,
+        envs: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        stdout_capture: Optional[OutputCapture] = None,
+        stderr_capture: Optional[OutputCapture] = None,
+    ) -> Tuple[bytes, bytes, int]:
+        """Run a command on a pooled worker.
+
+        Args:
+            command: Already quoted shell command
+            directory: Working directory for the command
+            envs: Additional environment variables
+            timeout: Optional timeout in seconds
+            stdout_capture: Optional bounded capture for stdout
+            stderr_capture: Optional bounded capture for stderr
+
+        Returns:
+            Tuple[bytes, bytes, int]: Tuple of (stdout, stderr, return_code)
+
+        Raises:
+            asyncio.TimeoutError: If the command does not finish in time
+            ValueError: If the command cannot be run on a worker
+        """
+        script = self.build_script(command, directory, envs)
+        worker = await self.acquire()
+        try:
+            result = await worker.run(
+                script,
+                timeout=timeout,
+                stdout_capture=stdout_capture,
+                stderr_capture=stderr_capture,
+            )
+        except BaseException:
+            # The worker state is unknown after a failure, never reuse it
+            await self._discard(worker)
+            raise
+        await self.release(worker)
+        return result
+
+    async def close(self) -> None:
+        """Close all workers and stop maintenance."""
+        self._closed = True
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            await self._discard(worker)
@@ -0,0 +1,169 @@
+"""Process objects for children that are not started by asyncio itself."""
+
+import asyncio
+import os
+import signal
+from typing import IO, Any, List, Optional, Tuple, Union
+
+StdioSpec = Union[IO[Any], int, None]
+
+
+class SpawnedProcess:
+    """A child process exposing the asyncio.subprocess.Process interface.
+
+    Used for children launched outside of asyncio's subprocess transports. The
+    launcher provides the pid, the parent ends of the stdio pipes and a future
+    that resolves to the exit status once the child has been reaped.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        exit_future: "asyncio.Future[int]",
+        stdin: Optional[asyncio.StreamWriter] = None,
+        stdout: Optional[asyncio.StreamReader] = None,
+        stderr: Optional[asyncio.StreamReader] = None,
+    ):
+        """Initialize the process.
+
+        Args:
+            pid: Process ID of the child
+            exit_future: Future resolved with the exit status of the child
+            stdin: Writer connected to the child's stdin, if piped
+            stdout: Reader connected to the child's stdout, if piped
+            stderr: Reader connected to the child's stderr, if piped
+        """
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self._exit_future = exit_future
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """Exit status of the child, None while it is running."""
+        if self._exit_future.done() and not self._exit_future.cancelled():
+            return self._exit_future.result()
+        return None
+
+    def send_signal(self, sig: int) -> None:
+        """Send a signal to the child if it is still running."""
+        if self.returncode is not None:
+            return
+        os.kill(self.pid, sig)
+
+    def terminate(self) -> None:
+        """Send SIGTERM to the child."""
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        """Send SIGKILL to the child."""
+        self.send_signal(signal.SIGKILL)
+
+    async def wait(self) -> int:
+        """Wait for the child to exit and return its exit status."""
+        return await asyncio.shield(self._exit_future)
+
+    async def _feed_stdin(self, input: Optional[bytes]) -> None:
+        assert self.stdin is not None
+        try:
+            if input:
+                self.stdin.write(input)
+                await self.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # The child exited or closed stdin before reading everything
+            pass
+        finally:
+            self.stdin.close()
+
+    @staticmethod
+    async def _read_all(stream: Optional[asyncio.StreamReader]) -> Optional[bytes]:
+        if stream is None:
+            return None
+        return await stream.read()
+
+    async def communicate(
+        self, input: Optional[bytes] = None
+    ) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Send input, read stdout and stderr to EOF and wait for the exit.
+
+        Args:
+            input: Bytes to write to the child's stdin
+
+        Returns:
+            Tuple of (stdout, stderr); None for streams that are not piped
+        """
+        feed = self._feed_stdin(input) if self.stdin is not None else None
+        tasks: List[Any] = [self._read_all(self.stdout), self._read_all(self.stderr)]
+        if feed is not None:
+            tasks.append(feed)
+        results = await asyncio.gather(*tasks)
+        await self.wait()
+        return results[0], results[1]
+
+
+def prepare_stdio(
+    spec: StdioSpec, for_reading: bool
+) -> Tuple[Optional[int], Optional[int]]:
+    """Translate a subprocess-style stdio spec into file descriptors.
+
+    Args:
+        spec: asyncio.subprocess.PIPE, DEVNULL, a file descriptor or a file object
+        for_reading: True if the parent reads from this stream (stdout, stderr)
+
+    Returns:
+        Tuple of (child_fd, parent_fd); parent_fd is set only for pipes and
+        both descriptors are owned by the caller
+    """
+    if spec == asyncio.subprocess.PIPE:
+        read_fd, write_fd = os.pipe()
+        if for_reading:
+            return write_fd, read_fd
+        return read_fd, write_fd
+    if spec == asyncio.subprocess.DEVNULL or spec is None:
+        return os.open(os.devnull, os.O_RDWR), None
+    if isinstance(spec, int):
+        return os.dup(spec), None
+    return os.dup(spec.fileno()), None
+
+
+async def connect_streams(
+    stdin_fd: Optional[int],
+    stdout_fd: Optional[int],
+    stderr_fd: Optional[int],
+) -> Tuple[
+    Optional[asyncio.StreamWriter],
+    Optional[asyncio.StreamReader],
+    Optional[asyncio.StreamReader],
+]:
+    """Wrap the parent ends of stdio pipes into asyncio streams.
+
+    Args:
+        stdin_fd: Write end of the child's stdin pipe
+        stdout_fd: Read end of the child's stdout pipe
+        stderr_fd: Read end of the child's stderr pipe
+
+    Returns:
+        Tuple of (stdin writer, stdout reader, stderr reader)
+    """
+    loop = asyncio.get_running_loop()
+
+    async def reader(fd: Optional[int]) -> Optional[asyncio.StreamReader]:
+        if fd is None:
+            return None
+        stream = asyncio.StreamReader(loop=loop)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stream, loop=loop),
+            os.fdopen(fd, "rb", buffering=0),
+        )
+        return stream
+
+    writer: Optional[asyncio.StreamWriter] = None
+    if stdin_fd is not None:
+        transport, protocol = await loop.connect_write_pipe(
+            lambda: asyncio.streams.FlowControlMixin(loop=loop),
+            os.fdopen(stdin_fd, "wb", buffering=0),
+        )
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+
+    return writer, await reader(stdout_fd), await reader(stderr_fd)
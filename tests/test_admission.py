@@ -0,0 +1,98 @@
+"""Test cases for the AdmissionController class."""
+
+import asyncio
+
+import pytest
+
+from mcp_shell_server.admission import AdmissionController
+from mcp_shell_server.shell_executor import ShellExecutor
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency_in_arrival_order():
+    controller = AdmissionController(max_concurrent=2)
+    running = []
+    peak = 0
+    order = []
+
+    async def job(name):
+        nonlocal peak
+        await controller.acquire()
+        running.append(name)
+        order.append(name)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(name)
+        controller.release()
+
+    await asyncio.gather(*(job(i) for i in range(6)))
+    assert peak == 2
+    assert order == list(range(6))
+    assert controller.stats()["admitted"] == 6
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+    await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.queued == 1
+
+    with pytest.raises(ValueError, match="Too many commands waiting to run"):
+        await controller.acquire()
+    assert controller.rejected == 1
+
+    controller.release()
+    await waiter
+    assert controller.active == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+    await controller.acquire()
+    with pytest.raises(ValueError, match="Timed out after 0.05 seconds"):
+        await controller.acquire()
+    assert controller.timed_out == 1
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_lets_smaller_request_through():
+    controller = AdmissionController(max_concurrent=3)
+    await controller.acquire(2)
+    # Needs more slots than are free and blocks the queue
+    heavy = asyncio.create_task(controller.acquire(3))
+    light = asyncio.create_task(controller.acquire(1))
+    await asyncio.sleep(0)
+    assert not light.done()
+
+    heavy.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await heavy
+    await asyncio.wait_for(light, 1)
+    assert controller.active == 3
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_executor_reports_queue_wait(monkeypatch, temp_test_dir):
+    monkeypatch.setenv("ALLOW_COMMANDS", "sleep")
+    monkeypatch.setenv("MCP_SHELL_MAX_CONCURRENT", "1")
+    executor = ShellExecutor(exec_mode="direct")
+    try:
+        first, second = await asyncio.gather(
+            executor.execute(["sleep", "0.3"], temp_test_dir),
+            executor.execute(["sleep", "0.3"], temp_test_dir),
+        )
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert first["error"] is None and second["error"] is None
+    waits = sorted([first["queue_wait_time"], second["queue_wait_time"]])
+    assert waits[0] < 0.1
+    assert waits[1] >= 0.25
+    # Time spent in the queue is not part of the execution time
+    assert second["execution_time"] < 0.6
@@ -0,0 +1,88 @@
+"""Test cases for cancelling running commands."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from mcp_shell_server.shell_executor import ShellExecutor
+
+
+def processes_with(marker: str) -> int:
+    """Count live sleep processes sleeping for marker seconds."""
+    count = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if f.read() == f"sleep\0{marker}\0".encode():
+                    count += 1
+        except OSError:
+            continue
+    return count
+
+
+async def wait_for_count(marker: str, expected: int, timeout: float = 10.0) -> int:
+    deadline = time.monotonic() + timeout
+    while processes_with(marker) != expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return processes_with(marker)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+@pytest.mark.asyncio
+async def test_cancel_storm_leaves_no_children(monkeypatch, temp_test_dir):
+    monkeypatch.setenv("ALLOW_COMMANDS", "sh")
+    monkeypatch.setenv("MCP_SHELL_MAX_CONCURRENT", "8")
+    executor = ShellExecutor(exec_mode="direct")
+    # Unique sleep time so only this test's grandchildren are counted
+    marker = f"{os.getpid() % 1000}.{time.monotonic_ns() % 10**6}"
+    command = ["sh", "-c", f"sleep {marker} & sleep {marker}; wait"]
+
+    tasks = [
+        asyncio.create_task(executor.execute(command, temp_test_dir)) for _ in range(12)
+    ]
+    try:
+        # Eight commands run with two sleeps each, four wait in the queue
+        assert await wait_for_count(marker, 16) == 16
+        assert executor.admission.queued == 4
+
+        start = time.monotonic()
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert time.monotonic() - start < 3
+
+        assert await wait_for_count(marker, 0, timeout=2) == 0
+        assert executor.admission.active == 0
+        assert executor.admission.queued == 0
+    finally:
+        for task in tasks:
+            task.cancel()
+        await executor.process_manager.cleanup_all()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+@pytest.mark.parametrize("exec_mode", ["direct", "shell"])
+@pytest.mark.asyncio
+async def test_cancel_kills_grandchildren(monkeypatch, temp_test_dir, exec_mode):
+    monkeypatch.setenv("ALLOW_COMMANDS", "sh")
+    executor = ShellExecutor(exec_mode=exec_mode)
+    marker = f"{os.getpid() % 1000}.{time.monotonic_ns() % 10**6 + 1}"
+    task = asyncio.create_task(
+        executor.execute(["sh", "-c", f"sleep {marker}; echo done"], temp_test_dir)
+    )
+    try:
+        # Interactive shells may take a while to read their startup files
+        assert await wait_for_count(marker, 1, timeout=30) == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert await wait_for_count(marker, 0, timeout=2) == 0
+        assert executor.admission.active == 0
+    finally:
+        task.cancel()
+        await executor.process_manager.cleanup_all()
@@ -0,0 +1,115 @@
+"""Test cases for the compiled command plans."""
+
+import random
+
+import pytest
+
+from mcp_shell_server.command_plan import CommandPlanner, Redirects, compile_command
+from mcp_shell_server.command_preprocessor import CommandPreProcessor
+from mcp_shell_server.command_validator import CommandValidator
+from mcp_shell_server.io_redirection_handler import IORedirectionHandler
+
+ALLOWED = frozenset({"ls", "echo", "cat"})
+
+
+def legacy_plan(command, validator, preprocessor, io_handler):
+    """Run the multi-pass processing the plan compiler replaces."""
+    cleaned = preprocessor.clean_command(preprocessor.preprocess_command(command))
+    if not cleaned:
+        return "Empty command", None
+    try:
+        if "|" in cleaned:
+            validator.validate_pipeline(cleaned)
+            commands = preprocessor.split_pipe_commands(cleaned)
+            for cmd in commands:
+                validator.validate_command(cmd)
+            stages = [io_handler.process_redirections(cmd) for cmd in commands]
+            if not all(cmd for cmd, _ in stages):
+                raise ValueError("Empty command")
+            return None, stages
+        for token in cleaned:
+            validator.validate_no_shell_operators(token)
+        cmd, _ = preprocessor.parse_command(cleaned)
+        validator.validate_command(cmd)
+        return None, [io_handler.process_redirections(cleaned)]
+    except ValueError as e:
+        return str(e), None
+
+
+def test_matches_legacy_processing(monkeypatch):
+    monkeypatch.setenv("ALLOW_COMMANDS", ",".join(ALLOWED))
+    monkeypatch.delenv("ALLOWED_COMMANDS", raising=False)
+    validator = CommandValidator()
+    preprocessor = CommandPreProcessor()
+    io_handler = IORedirectionHandler()
+    alphabet = [
+        "ls",
+        "echo",
+        "cat",
+        " cat",
+        "rm",
+        "out.txt",
+        "",
+        "|",
+        "a|b",
+        "ls|",
+        ">",
+        ">>",
+        "<",
+        ";",
+        "&&",
+        "||",
+    ]
+    rng = random.Random(0)
+    for _ in range(5000):
+        command = [rng.choice(alphabet) for _ in range(rng.randint(0, 7))]
+        error, stages = legacy_plan(command, validator, preprocessor, io_handler)
+        plan = compile_command(command, ALLOWED)
+        assert plan.error == error, command
+        if error is None:
+            assert [
+                (list(stage.argv), stage.redirects.as_dict()) for stage in plan.stages
+            ] == stages, command
+
+
+def test_compile_pipeline_with_redirects():
+    plan = compile_command(
+        ["cat", "<", "in.txt", "|", "ls", "-l", ">>", "out"], ALLOWED
+    )
+    assert plan.error is None
+    assert plan.is_pipeline
+    assert [stage.argv for stage in plan.stages] == [("cat",), ("ls", "-l")]
+    assert plan.stages[0].redirects == Redirects(stdin="in.txt")
+    assert plan.stages[1].redirects == Redirects(stdout="out", stdout_append=True)
+
+
+@pytest.mark.parametrize(
+    "command,error",
+    [
+        ([], "Empty command"),
+        (["rm", "-rf"], "Command not allowed: rm"),
+        (["ls", ";", "ls"], "Unexpected shell operator: ;"),
+        (["ls", "|", "ls", "&&"], "Unexpected shell operator in pipeline: &&"),
+        (["echo", ">"], "Missing path for output redirection"),
+    ],
+)
+def test_compile_errors(command, error):
+    assert compile_command(command, ALLOWED).error == error
+
+
+def test_planner_caches_plans(monkeypatch, mocker):
+    monkeypatch.setenv("ALLOW_COMMANDS", "ls")
+    planner = CommandPlanner(CommandValidator())
+    compile_spy = mocker.patch(
+        "mcp_shell_server.command_plan.compile_command", wraps=compile_command
+    )
+
+    plan = planner.plan(["ls", "-l"])
+    assert plan.error is None
+    assert planner.plan(["ls", "-l"]) is plan
+    assert compile_spy.call_count == 1
+
+    # Changing the whitelist recompiles the plan
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo")
+    assert planner.plan(["ls", "-l"]).error == "Command not allowed: ls"
+    assert compile_spy.call_count == 2
@@ -0,0 +1,75 @@
+"""Test cases for the EnvironmentCache class."""
+
+import pytest
+
+from mcp_shell_server.environment import EnvironmentCache
+from mcp_shell_server.process_manager import ProcessManager
+
+
+def test_full_profile_merges_overrides(monkeypatch):
+    monkeypatch.setenv("MCP_TEST_VAR", "server")
+    cache = EnvironmentCache()
+
+    env = cache.get({"MCP_TEST_OVERRIDE": "1"})
+    assert env["MCP_TEST_VAR"] == "server"
+    assert env["MCP_TEST_OVERRIDE"] == "1"
+    assert cache.get({"MCP_TEST_OVERRIDE": "1"}) is env
+    assert cache.get({"MCP_TEST_OVERRIDE": "2"}) is not env
+
+
+def test_invalidated_when_server_environment_changes(monkeypatch):
+    monkeypatch.setenv("MCP_TEST_VAR", "before")
+    cache = EnvironmentCache()
+    base = cache.get()
+    cached = cache.get({"X": "1"})
+    assert cache.get() is base
+
+    monkeypatch.setenv("MCP_TEST_VAR", "after")
+    assert cache.get()["MCP_TEST_VAR"] == "after"
+    assert cache.get({"X": "1"}) is not cached
+
+    monkeypatch.delenv("MCP_TEST_VAR")
+    assert "MCP_TEST_VAR" not in cache.get()
+
+
+def test_minimal_profile(monkeypatch):
+    monkeypatch.setenv("PATH", "/usr/bin:/bin")
+    monkeypatch.setenv("MCP_TEST_SECRET", "secret")
+    monkeypatch.setenv("MCP_TEST_KEEP", "keep")
+    cache = EnvironmentCache(profile="minimal", allowlist=["MCP_TEST_KEEP"])
+
+    env = cache.get({"MCP_TEST_OVERRIDE": "1"})
+    assert env["PATH"] == "/usr/bin:/bin"
+    assert env["MCP_TEST_KEEP"] == "keep"
+    assert env["MCP_TEST_OVERRIDE"] == "1"
+    assert "MCP_TEST_SECRET" not in env
+
+
+def test_lru_bound():
+    cache = EnvironmentCache(max_entries=2)
+    first = cache.get({"A": "1"})
+    cache.get({"A": "2"})
+    cache.get({"A": "3"})
+    assert cache.get({"A": "1"}) is not first
+
+
+def test_invalid_profile():
+    with pytest.raises(ValueError, match="Invalid environment profile: tiny"):
+        EnvironmentCache(profile="tiny")
+
+
+@pytest.mark.asyncio
+async def test_process_manager_minimal_profile(monkeypatch):
+    monkeypatch.setenv("MCP_SHELL_ENV_PROFILE", "minimal")
+    monkeypatch.setenv("MCP_TEST_SECRET", "secret")
+    manager = ProcessManager()
+    try:
+        process = await manager.create_exec_process(
+            ["env"], "/tmp", envs={"MCP_TEST_OVERRIDE": "1"}
+        )
+        stdout, _ = await process.communicate()
+    finally:
+        await manager.cleanup_all()
+
+    assert b"MCP_TEST_OVERRIDE=1" in stdout
+    assert b"MCP_TEST_SECRET" not in stdout
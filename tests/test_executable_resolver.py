@@ -0,0 +1,70 @@
+"""Test cases for the ExecutableResolver class."""
+
+import os
+import stat
+
+import pytest
+
+from mcp_shell_server.command_validator import CommandValidator
+from mcp_shell_server.executable_resolver import ExecutableResolver
+from mcp_shell_server.server import call_tool
+
+
+def make_executable(directory, name):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def test_resolve_uses_cache(tmp_path, mocker):
+    target = make_executable(str(tmp_path), "tool")
+    resolver = ExecutableResolver(check_interval=60)
+    which = mocker.spy(__import__("shutil"), "which")
+
+    assert resolver.resolve("tool", str(tmp_path)) == target
+    assert resolver.resolve("tool", str(tmp_path)) == target
+    assert which.call_count == 1
+
+
+def test_resolve_missing_and_absolute(tmp_path):
+    resolver = ExecutableResolver()
+    assert resolver.resolve("missing", str(tmp_path)) is None
+    assert resolver.resolve("/bin/sh", str(tmp_path)) == "/bin/sh"
+
+
+def test_resolve_invalidates_on_path_change(tmp_path):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    path = f"{first}{os.pathsep}{second}"
+    resolver = ExecutableResolver(check_interval=0)
+
+    old = make_executable(str(second), "tool")
+    assert resolver.resolve("tool", path) == old
+
+    new = make_executable(str(first), "tool")
+    os.utime(first, ns=(0, os.stat(first).st_mtime_ns + 1))
+    assert resolver.resolve("tool", path) == new
+
+
+def test_validator_resolved_commands(tmp_path, monkeypatch):
+    target = make_executable(str(tmp_path), "tool")
+    monkeypatch.delenv("ALLOWED_COMMANDS", raising=False)
+    monkeypatch.setenv("ALLOW_COMMANDS", "tool,missing")
+    validator = CommandValidator()
+
+    assert validator.get_resolved_commands(str(tmp_path)) == {
+        "missing": None,
+        "tool": target,
+    }
+
+
+@pytest.mark.asyncio
+async def test_list_commands_tool(monkeypatch):
+    monkeypatch.setenv("ALLOW_COMMANDS", "sh")
+    result = await call_tool("shell_list_commands", {})
+    assert len(result) == 1
+    assert "sh: /" in result[0].text
@@ -0,0 +1,85 @@
+"""Tests for the fork server launcher."""
+
+import asyncio
+import os
+import signal
+
+import pytest
+import pytest_asyncio
+
+from mcp_shell_server.forkserver_client import ForkServerClient
+from mcp_shell_server.process_manager import ProcessManager
+
+
+@pytest_asyncio.fixture
+async def client():
+    """Fixture for a running fork server client."""
+    client = ForkServerClient()
+    await client.start()
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_spawn_with_pipes(client, tmp_path):
+    """Test spawning a child with piped stdio, cwd and env."""
+    process = await client.spawn(
+        ["/bin/sh", "-c", 'cat; pwd; echo "$FOO" >&2; exit 7'],
+        cwd=str(tmp_path),
+        env={"FOO": "bar", "PATH": os.environ["PATH"]},
+    )
+    stdout, stderr = await process.communicate(b"input\n")
+
+    assert stdout == f"input\n{tmp_path}\n".encode()
+    assert stderr == b"bar\n"
+    assert process.returncode == 7
+
+
+@pytest.mark.asyncio
+async def test_spawn_to_file(client, tmp_path):
+    """Test redirecting the child's stdout to a file object."""
+    output = tmp_path / "out.txt"
+    with open(output, "w") as f:
+        process = await client.spawn(["/bin/echo", "to file"], stdout=f)
+        stdout, _ = await process.communicate()
+
+    assert stdout is None
+    assert output.read_text() == "to file\n"
+
+
+@pytest.mark.asyncio
+async def test_spawn_missing_program(client):
+    """Test that exec failures surface as OSError."""
+    with pytest.raises(FileNotFoundError):
+        await client.spawn(["/nonexistent/program"])
+    assert client.is_running
+
+
+@pytest.mark.asyncio
+async def test_kill_spawned_process(client):
+    """Test signalling a child started by the helper."""
+    process = await client.spawn(["/bin/sleep", "10"])
+    process.kill()
+    assert await asyncio.wait_for(process.wait(), 5) == -signal.SIGKILL
+
+
+@pytest.mark.asyncio
+async def test_process_manager_forkserver_launcher(tmp_path):
+    """Test ProcessManager delegating spawns to the fork server."""
+    manager = ProcessManager(launcher="forkserver")
+    try:
+        process = await manager.create_process("echo hello | tr a-z A-Z", str(tmp_path))
+        stdout, stderr = await manager.execute_with_timeout(process, timeout=5)
+        assert stdout == b"HELLO\n"
+        assert process.returncode == 0
+
+        with pytest.raises(ValueError, match="Failed to create process"):
+            await manager.create_exec_process(["/nonexistent/program"], "/")
+    finally:
+        await manager.cleanup_all()
+
+
+def test_invalid_launcher():
+    """Test that an unknown launcher is rejected."""
+    with pytest.raises(ValueError, match="Invalid launcher: bogus"):
+        ProcessManager(launcher="bogus")
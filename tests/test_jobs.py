@@ -0,0 +1,164 @@
+"""Test cases for background jobs."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from mcp_shell_server.jobs import Job, JobRegistry
+from mcp_shell_server.output_store import StoredOutput
+from mcp_shell_server.server import (
+    ExecuteToolHandler,
+    JobCancelToolHandler,
+    JobOutputToolHandler,
+    JobStartToolHandler,
+    JobWaitToolHandler,
+    complete_utf8_length,
+)
+from mcp_shell_server.shell_executor import ShellExecutor
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo,sleep,sh,false")
+    return ShellExecutor(exec_mode="direct")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background(executor, temp_test_dir):
+    job = executor.start_job(["echo", "hello"], temp_test_dir)
+    assert job.state == "running"
+    jobs = executor.process_manager.jobs
+    assert jobs.get(job.job_id) is job
+
+    await jobs.wait(job.job_id, timeout=5)
+    status = job.status()
+    assert status["state"] == "succeeded"
+    assert status["result"]["returncode"] == 0
+    assert "stdout" not in status["result"]
+    assert status["output_bytes"]["stdout"] == 6
+    assert job.output.stream("stdout").read(0, 100) == b"hello\n"
+
+
+@pytest.mark.asyncio
+async def test_job_output_is_readable_while_running(executor, temp_test_dir):
+    job = executor.start_job(
+        ["sh", "-c", "echo first; sleep 5; echo second"], temp_test_dir
+    )
+    jobs = executor.process_manager.jobs
+    try:
+        deadline = time.monotonic() + 5
+        while job.output.stream("stdout").size < 6 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert job.output.stream("stdout").read(0, 100) == b"first\n"
+
+        # Waiting with a timeout returns the job still running
+        assert (await jobs.wait(job.job_id, timeout=0.1)).state == "running"
+
+        start = time.monotonic()
+        await jobs.cancel(job.job_id)
+        assert time.monotonic() - start < 3
+        assert job.state == "cancelled"
+        assert job.done.is_set()
+    finally:
+        await executor.process_manager.cleanup_all()
+
+
+@pytest.mark.asyncio
+async def test_failed_job(executor, temp_test_dir):
+    jobs = executor.process_manager.jobs
+    job = await jobs.wait(executor.start_job(["false"], temp_test_dir).job_id, 5)
+    assert job.state == "failed"
+    assert job.result["status"] == 1
+
+    job = await jobs.wait(executor.start_job(["rm", "x"], temp_test_dir).job_id, 5)
+    assert job.state == "failed"
+    assert job.result["error"] == "Command not allowed: rm"
+
+
+@pytest.mark.asyncio
+async def test_registry_limits_and_retention():
+    jobs = JobRegistry(max_running=1, max_finished=2, ttl=None)
+
+    def make(job_id):
+        return Job(job_id, ["echo"], "/tmp", StoredOutput(job_id, 1024))
+
+    first = make("a")
+    jobs.add(first)
+    with pytest.raises(ValueError, match=r"Too many running jobs \(limit 1\)"):
+        jobs.add(make("b"))
+
+    first.finish("succeeded", {"status": 0, "stdout": "x"})
+    assert first.result == {"status": 0}
+    for job_id in ("b", "c", "d"):
+        job = make(job_id)
+        jobs.add(job)
+        job.finish("succeeded", {"status": 0})
+
+    # Only the two most recently finished jobs are kept
+    with pytest.raises(ValueError, match="Unknown job id: a"):
+        jobs.get("a")
+    with pytest.raises(ValueError, match="Output is no longer available"):
+        first.output.stream("stdout").read(0, 1)
+    assert jobs.get("d").state == "succeeded"
+
+    expiring = JobRegistry(ttl=60)
+    old = make("old")
+    expiring.add(old)
+    old.finish("succeeded")
+    old.finished_at -= 120
+    with pytest.raises(ValueError, match="Unknown job id: old"):
+        expiring.get("old")
+
+
+def test_complete_utf8_length():
+    assert complete_utf8_length(b"") == 0
+    assert complete_utf8_length(b"abc") == 3
+    assert complete_utf8_length("aé".encode()) == 3
+    assert complete_utf8_length("aé".encode()[:2]) == 1
+    assert complete_utf8_length("a€".encode()[:3]) == 1
+    assert complete_utf8_length("a😀".encode()) == 5
+    assert complete_utf8_length("a😀".encode()[:4]) == 1
+
+
+@pytest.mark.asyncio
+async def test_job_tools(monkeypatch, temp_test_dir):
+    monkeypatch.setenv("ALLOW_COMMANDS", "sh")
+    monkeypatch.setenv("MCP_SHELL_EXEC_MODE", "direct")
+    execute_handler = ExecuteToolHandler()
+    executor = execute_handler.executor
+    start = JobStartToolHandler(execute_handler)
+    output = JobOutputToolHandler(executor)
+    output.max_bytes = 2
+
+    started = json.loads(
+        (
+            await start.run_tool(
+                {"command": ["sh", "-c", "printf 'héllo'"], "directory": temp_test_dir}
+            )
+        )[0].text
+    )
+    job_id = started["job_id"]
+    status = json.loads(
+        (await JobWaitToolHandler(executor).run_tool({"job_id": job_id}))[0].text
+    )
+    assert status["state"] == "succeeded"
+
+    # Reads are capped at max_bytes and resume from next_offset
+    text, meta = await output.run_tool({"job_id": job_id})
+    assert text.text == "h"
+    meta = json.loads(meta.text)
+    assert (meta["next_offset"], meta["size"]) == (1, 6)
+    text, meta = await output.run_tool(
+        {"job_id": job_id, "offset": meta["next_offset"]}
+    )
+    assert text.text == "é"
+    assert json.loads(meta.text)["next_offset"] == 3
+
+    status = json.loads(
+        (await JobCancelToolHandler(executor).run_tool({"job_id": job_id}))[0].text
+    )
+    assert status["state"] == "succeeded"
+    with pytest.raises(ValueError, match="Unknown job id: missing"):
+        await output.run_tool({"job_id": "missing"})
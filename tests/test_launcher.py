@@ -0,0 +1,90 @@
+"""Tests for the process launcher backends."""
+
+import asyncio
+import os
+import signal
+
+import pytest
+
+from mcp_shell_server.launcher import (
+    LAUNCHERS,
+    AsyncioLauncher,
+    PosixSpawnLauncher,
+    create_launcher,
+)
+from mcp_shell_server.process_manager import ProcessManager
+
+
+@pytest.fixture(params=sorted(LAUNCHERS))
+def launcher_name(request):
+    """Name of each available launcher."""
+    return request.param
+
+
+@pytest.mark.asyncio
+async def test_spawn_exec_wiring(launcher_name, tmp_path):
+    """Test cwd, env and stdio wiring for every launcher."""
+    launcher = create_launcher(launcher_name)
+    try:
+        process = await launcher.spawn_exec(
+            ["sh", "-c", 'cat; pwd; echo "$FOO" >&2; exit 4'],
+            cwd=str(tmp_path),
+            env={"FOO": "bar", "PATH": os.environ["PATH"]},
+        )
+        stdout, stderr = await process.communicate(b"data\n")
+    finally:
+        await launcher.close()
+
+    assert stdout == f"data\n{tmp_path}\n".encode()
+    assert stderr == b"bar\n"
+    assert process.returncode == 4
+
+
+@pytest.mark.asyncio
+async def test_spawn_new_session(launcher_name):
+    """Test that start_new_session puts the child in its own session."""
+    launcher = create_launcher(launcher_name)
+    try:
+        process = await launcher.spawn_exec(
+            ["/bin/sleep", "10"], start_new_session=True
+        )
+        assert os.getsid(process.pid) == process.pid
+        process.kill()
+        assert await asyncio.wait_for(process.wait(), 5) == -signal.SIGKILL
+    finally:
+        await launcher.close()
+
+
+@pytest.mark.asyncio
+async def test_posix_spawn_missing_program():
+    """Test that exec failures are raised by the posix_spawn backend."""
+    with pytest.raises(FileNotFoundError):
+        await PosixSpawnLauncher().spawn_exec(["/nonexistent/program"])
+
+
+@pytest.mark.asyncio
+async def test_posix_spawn_keeps_server_cwd(tmp_path):
+    """Test that spawning in another directory leaves the server's cwd alone."""
+    before = os.getcwd()
+    process = await PosixSpawnLauncher().spawn_exec(["pwd"], cwd=str(tmp_path))
+    stdout, _ = await process.communicate()
+
+    assert stdout.strip() == str(tmp_path).encode()
+    assert os.getcwd() == before
+
+
+@pytest.mark.asyncio
+async def test_process_manager_posix_spawn_launcher(tmp_path):
+    """Test ProcessManager with the posix_spawn backend."""
+    manager = ProcessManager(launcher="posix_spawn")
+    process = await manager.create_process("echo hi | tr a-z A-Z", str(tmp_path))
+    stdout, _ = await manager.execute_with_timeout(process, timeout=5)
+
+    assert stdout == b"HI\n"
+    assert process.returncode == 0
+
+
+def test_process_manager_accepts_launcher_instance():
+    """Test passing a launcher object instead of a name."""
+    launcher = AsyncioLauncher()
+    assert ProcessManager(launcher=launcher).launcher is launcher
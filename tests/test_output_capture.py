@@ -0,0 +1,130 @@
+"""Test cases for the bounded output capture."""
+
+import random
+
+import pytest
+
+from mcp_shell_server.output_capture import OutputCapture, parse_output_limits
+from mcp_shell_server.shell_executor import ShellExecutor
+
+
+def test_unbounded_capture_keeps_everything():
+    capture = OutputCapture()
+    capture.write(b"hello ")
+    capture.write(b"world")
+    assert capture.getvalue() == b"hello world"
+    assert not capture.truncated
+
+
+def test_head_and_tail_match_reference():
+    rng = random.Random(0)
+    for _ in range(200):
+        head_limit, tail_limit = rng.randint(0, 10), rng.randint(0, 10)
+        capture = OutputCapture(head_limit, tail_limit)
+        data = b""
+        for _ in range(rng.randint(0, 8)):
+            chunk = bytes(rng.randrange(256) for _ in range(rng.randint(0, 15)))
+            capture.write(chunk)
+            data += chunk
+
+        rest = data[head_limit:]
+        tail = rest[max(0, len(rest) - tail_limit) :] if tail_limit else b""
+        assert capture.head == data[:head_limit]
+        assert capture.tail == tail
+        assert capture.dropped_bytes == len(rest) - len(tail)
+        assert capture.total_bytes == len(data)
+
+
+def test_truncation_marker():
+    capture = OutputCapture(3, 3)
+    capture.write(b"abcdefghij")
+    assert capture.truncated
+    assert capture.getvalue() == b"abc\n... [4 bytes truncated] ...\nhij"
+
+
+def test_merge_counts_dropped_bytes():
+    first = OutputCapture(2, 2)
+    first.write(b"123456")
+    merged = first.empty_copy()
+    merged.merge(first)
+    assert merged.head == b"12"
+    assert merged.tail == b"56"
+    assert merged.dropped_bytes == 2
+
+
+def test_parse_output_limits():
+    assert parse_output_limits("cat=10:20, find = 0:5,") == {
+        "cat": (10, 20),
+        "find": (0, 5),
+    }
+    with pytest.raises(ValueError, match="Invalid output limit: cat=10"):
+        parse_output_limits("cat=10")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exec_mode", ["shell", "direct", "pool"])
+async def test_large_output_is_bounded(monkeypatch, temp_test_dir, exec_mode):
+    monkeypatch.setenv("ALLOW_COMMANDS", "head,yes")
+    monkeypatch.setenv("MCP_SHELL_OUTPUT_LIMITS", "head=64:32")
+    executor = ShellExecutor(exec_mode=exec_mode)
+    try:
+        result = await executor.execute(
+            ["head", "-c", "10000000", "/dev/zero"], temp_test_dir
+        )
+        # Limits given with the call take precedence
+        override = await executor.execute(
+            ["yes", "|", "head", "-c", "1000"], temp_test_dir, head_bytes=10
+        )
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert result["error"] is None
+    assert result["truncated"]
+    assert result["dropped_bytes"]["stdout"] == 10000000 - 96
+    assert len(result["stdout"]) < 200
+    assert override["truncated"]
+    assert override["dropped_bytes"]["stdout"] == 1000 - 42
+
+
+def test_gettext_decodes_chunks_split_inside_characters():
+    data = "héllo wörld ✓\n".encode() * 10
+    capture = OutputCapture(errors="strict")
+    for i in range(len(data)):
+        capture.write(data[i : i + 1])
+    assert capture.gettext() == data.decode()
+
+
+def test_gettext_skips_character_cut_by_truncation():
+    capture = OutputCapture(2, 4, errors="strict")
+    capture.write("aé".encode() + b"x" * 10 + "✓é".encode())
+    # Both cuts fall inside a multibyte character, neither is reported invalid
+    assert capture.gettext() == "a\n... [12 bytes truncated] ...\né"
+
+
+def test_gettext_errors_policy():
+    replaced = OutputCapture(errors="replace")
+    replaced.write(b"ok \xff")
+    assert replaced.gettext() == "ok �"
+
+    strict = OutputCapture(errors="strict")
+    strict.write(b"ok \xff")
+    with pytest.raises(ValueError, match="Output is not valid UTF-8"):
+        strict.gettext()
+
+
+@pytest.mark.asyncio
+async def test_binary_output(monkeypatch, temp_test_dir):
+    monkeypatch.setenv("ALLOW_COMMANDS", "printf")
+    executor = ShellExecutor(exec_mode="direct")
+    command = ["printf", "a\\213\\377\\000"]
+    try:
+        text = await executor.execute(command, temp_test_dir)
+        binary = await executor.execute(command, temp_test_dir, binary=True)
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert text["error"] is None
+    assert text["stdout"] == "a��\x00"
+    assert binary["error"] is None
+    assert binary["stdout"] == ""
+    assert binary["stdout_data"] == b"a\x8b\xff\x00"
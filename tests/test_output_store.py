@@ -0,0 +1,101 @@
+"""Test cases for the spill-to-disk output store."""
+
+import pytest
+
+from mcp_shell_server.output_store import OutputSpool, OutputStore
+from mcp_shell_server.server import ReadOutputToolHandler
+from mcp_shell_server.shell_executor import ShellExecutor
+
+
+def test_spool_spills_to_disk_and_reads_ranges(tmp_path):
+    spool = OutputSpool(spill_threshold=8, directory=str(tmp_path))
+    spool.write(b"line0\n")
+    assert not spool.spilled
+    spool.write(b"line1\nline2\n")
+    assert spool.spilled
+    assert spool.read(6, 5) == b"line1"
+
+    # Writes after the file was mapped are visible to later reads
+    spool.write(b"tail")
+    assert spool.size == 22
+    assert spool.read(18, 100) == b"tail"
+    assert spool.read(100, 10) == b""
+
+    assert spool.line_range(1, 2) == (6, 18)
+    assert spool.line_range(3, 5) == (18, 22)
+    assert spool.line_range(10, 1) == (22, 22)
+    assert spool.line_count == 4
+    assert spool.tail_range(2) == (12, 22)
+    assert spool.tail_range(10) == (0, 22)
+
+    spool.close()
+    with pytest.raises(ValueError, match="Output is no longer available"):
+        spool.read(0, 1)
+
+
+def test_line_index_matches_splitlines():
+    spool = OutputSpool(spill_threshold=64)
+    data = b"".join(b"x" * (i % 7) + b"\n" for i in range(500)) + b"last"
+    for start in range(0, len(data), 13):
+        spool.write(memoryview(data)[start : start + 13])
+
+    lines = data.splitlines(keepends=True)
+    assert spool.line_count == len(lines)
+    for start in (0, 1, 250, 499, 500):
+        begin, end = spool.line_range(start, 3)
+        assert spool.read(begin, end - begin) == b"".join(lines[start : start + 3])
+    begin, end = spool.tail_range(2)
+    assert spool.read(begin, end - begin) == b"".join(lines[-2:])
+
+
+def test_store_evicts_oldest_outputs():
+    store = OutputStore(max_entries=2)
+    first = store.create()
+    second = store.create()
+    assert store.get(first.output_id) is first
+    store.create()
+
+    # The least recently used output is dropped
+    assert store.get(first.output_id) is first
+    with pytest.raises(ValueError, match=f"Unknown output id: {second.output_id}"):
+        store.get(second.output_id)
+    assert second.stream("stdout").closed
+
+    with pytest.raises(ValueError, match="Invalid output stream: stdin"):
+        first.stream("stdin")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exec_mode", ["direct", "pool"])
+async def test_read_truncated_output_by_pages(monkeypatch, temp_test_dir, exec_mode):
+    monkeypatch.setenv("ALLOW_COMMANDS", "seq")
+    monkeypatch.setenv("MCP_SHELL_OUTPUT_HEAD_BYTES", "10")
+    monkeypatch.setenv("MCP_SHELL_OUTPUT_TAIL_BYTES", "10")
+    monkeypatch.setenv("MCP_SHELL_OUTPUT_SPILL_BYTES", "1024")
+    executor = ShellExecutor(exec_mode=exec_mode)
+    try:
+        result = await executor.execute(["seq", "100000"], temp_test_dir)
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert result["truncated"]
+    assert result["line_count"]["stdout"] == 100000
+    stored = executor.output_store.get(result["output_id"])
+    assert stored.stream("stdout").spilled
+    expected = "".join(f"{i}\n" for i in range(1, 100001)).encode()
+    assert stored.stream("stdout").size == len(expected)
+
+    handler = ReadOutputToolHandler(executor)
+    lines = await handler.run_tool(
+        {"output_id": result["output_id"], "start_line": 49999, "line_count": 2}
+    )
+    assert lines[0].text == "50000\n50001\n"
+
+    last = await handler.run_tool({"output_id": result["output_id"], "last_lines": 2})
+    assert last[0].text == "99999\n100000\n"
+
+    page = await handler.run_tool(
+        {"output_id": result["output_id"], "offset": 100, "length": 20}
+    )
+    assert page[0].text == expected[100:120].decode()
+    assert page[1].text == f"Bytes 100-120 de {len(expected)}, 100000 linhas (stdout)"
@@ -1,6 +1,7 @@
 """Tests for the ProcessManager class."""
 
 import asyncio
+import os
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -191,3 +192,90 @@ async def test_execute_pipeline_timeout(process_manager):
                 timeout=1,
             )
             mock_proc.kill.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_create_exec_process(process_manager):
+    """Test creating a process that bypasses the shell."""
+    mock_proc = create_mock_process()
+    with patch(
+        "mcp_shell_server.process_manager.asyncio.create_subprocess_exec",
+        new_callable=AsyncMock,
+        return_value=mock_proc,
+    ) as mock_create:
+        process = await process_manager.create_exec_process(
+            ["echo", "test"], directory="/tmp", envs={"FOO": "bar"}
+        )
+
+        assert process == mock_proc
+        assert mock_create.call_args.args == ("echo", "test")
+        assert mock_create.call_args.kwargs["cwd"] == "/tmp"
+        assert mock_create.call_args.kwargs["env"]["FOO"] == "bar"
+
+
+@pytest.mark.asyncio
+async def test_create_exec_process_with_error(process_manager):
+    """Test creating a direct process whose program cannot be executed."""
+    with pytest.raises(ValueError, match="Failed to create process"):
+        await process_manager.create_exec_process(
+            ["/nonexistent/program"], directory="/tmp"
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("launcher", ProcessManager.LAUNCHERS)
+async def test_execute_pipeline_streams_between_stages(launcher):
+    """Test that stages run concurrently, connected by OS pipes."""
+    manager = ProcessManager(launcher=launcher)
+    fds_before = len(os.listdir("/proc/self/fd"))
+    try:
+        # `yes` never ends on its own, the pipeline only completes if head
+        # runs at the same time and yes is then stopped by SIGPIPE
+        stdout, stderr, return_code = await manager.execute_pipeline(
+            [["yes"], ["head", "-n", "3"], "tr y Y"],
+            directory="/tmp",
+            timeout=10,
+        )
+    finally:
+        await manager.cleanup_all()
+
+    assert stdout == b"Y\nY\nY\n"
+    assert stderr == b""
+    assert return_code == 0
+    assert len(os.listdir("/proc/self/fd")) == fds_before
+
+
+@pytest.mark.asyncio
+async def test_execute_pipeline_earlier_stage_failure(process_manager):
+    """Test that a failing earlier stage fails the pipeline."""
+    with pytest.raises(ValueError, match="Command failed with exit code 1"):
+        await process_manager.execute_pipeline(
+            [["false"], ["cat"]], directory="/tmp", timeout=10
+        )
+
+
+@pytest.mark.asyncio
+async def test_execute_with_timeout_streams_output(process_manager):
+    """Test that output reaches on_output while the process is still running."""
+    loop = asyncio.get_running_loop()
+    chunks = []
+
+    async def on_output(name, data):
+        chunks.append((name, data, loop.time()))
+
+    process = await process_manager.create_exec_process(
+        ["sh", "-c", "printf first; sleep 0.5; printf second >&2"], "/tmp"
+    )
+    start = loop.time()
+    stdout, stderr = await process_manager.execute_with_timeout(
+        process, timeout=5, on_output=on_output, chunk_size=1024, flush_interval=0.05
+    )
+    await process_manager.cleanup_all()
+
+    assert (stdout, stderr) == (b"", b"")
+    assert [(name, data) for name, data, _ in chunks] == [
+        ("stdout", b"first"),
+        ("stderr", b"second"),
+    ]
+    # The first chunk was flushed before the process slept
+    assert chunks[0][2] - start < 0.4
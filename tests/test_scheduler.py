@@ -0,0 +1,96 @@
+"""Test cases for the FairScheduler class."""
+
+import asyncio
+
+import pytest
+
+from mcp_shell_server.admission import AdmissionController
+from mcp_shell_server.scheduler import FairScheduler, parse_class_weights
+
+
+def test_service_is_shared_by_weight():
+    scheduler = FairScheduler(weights={"a": 3, "b": 1})
+    for i in range(8):
+        scheduler.push("a", f"a{i}")
+        scheduler.push("b", f"b{i}")
+
+    served = [scheduler.pop() for _ in range(8)]
+    assert sum(item.startswith("a") for item in served) == 6
+    # Items of a class keep their order
+    assert [item for item in served if item.startswith("a")] == [
+        f"a{i}" for i in range(6)
+    ]
+
+
+def test_busy_class_does_not_delay_a_newcomer():
+    scheduler = FairScheduler()
+    for i in range(100):
+        scheduler.push("find", f"find{i}")
+    scheduler.pop()
+    scheduler.push("cat", "cat")
+    assert [scheduler.pop() for _ in range(2)].count("cat") == 1
+
+
+def test_starvation_protection():
+    now = [0.0]
+    scheduler = FairScheduler(
+        weights={"low": 0.001}, max_wait=5.0, clock=lambda: now[0]
+    )
+    scheduler.push("high", "high0")
+    scheduler.push("low", "low")
+    for i in range(1, 10):
+        scheduler.push("high", f"high{i}")
+
+    assert scheduler.pop() == "high0"
+    assert scheduler.pop() == "high1"
+    now[0] = 6.0
+    assert scheduler.pop() == "low"
+    stats = scheduler.stats()
+    assert stats["low"]["served"] == 1
+    assert stats["low"]["wait_max"] == 6.0
+    assert stats["high"]["queued"] == 8
+
+
+def test_discard():
+    scheduler = FairScheduler()
+    scheduler.push("a", "first")
+    scheduler.push("a", "second")
+    scheduler.discard("first")
+    assert len(scheduler) == 1
+    assert scheduler.peek() == "second"
+    assert scheduler.stats()["a"]["dropped"] == 1
+    assert scheduler.pop() == "second"
+    assert scheduler.peek() is None
+    with pytest.raises(IndexError):
+        scheduler.pop()
+
+
+def test_parse_class_weights():
+    assert parse_class_weights("high=4, low=0.5,") == {"high": 4.0, "low": 0.5}
+    with pytest.raises(ValueError, match="Invalid class weight: low=0"):
+        parse_class_weights("low=0")
+    with pytest.raises(ValueError, match="Invalid class weight: high"):
+        parse_class_weights("high")
+
+
+@pytest.mark.asyncio
+async def test_admission_serves_tenants_fairly():
+    controller = AdmissionController(max_concurrent=1)
+    await controller.acquire(tenant="spam")
+    order = []
+
+    async def job(tenant):
+        await controller.acquire(tenant=tenant)
+        order.append(tenant)
+        await asyncio.sleep(0)
+        controller.release()
+
+    tasks = [asyncio.create_task(job("spam")) for _ in range(5)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(job("quick")))
+    await asyncio.sleep(0)
+    controller.release()
+    await asyncio.gather(*tasks)
+
+    assert order.index("quick") <= 1
+    assert controller.stats()["classes"]["spam"]["served"] == 6
@@ -102,9 +102,19 @@ async def test_tool_execution_timeout(monkeypatch):
                 "timeout": 1,
             },
         )
-    tools = await list_tools()
-    assert len(tools) == 1
-    tool = tools[0]
+    tools = {tool.name: tool for tool in await list_tools()}
+    assert set(tools) == {
+        "shell_execute",
+        "shell_list_commands",
+        "shell_read_output",
+        "shell_execute_batch",
+        "shell_job_start",
+        "shell_job_status",
+        "shell_job_output",
+        "shell_job_wait",
+        "shell_job_cancel",
+    }
+    tool = tools["shell_execute"]
     assert isinstance(tool, Tool)
     assert tool.name == "shell_execute"
     assert tool.description
@@ -310,7 +320,13 @@ async def test_call_tool_with_stderr(monkeypatch):
     """Test command execution with stderr output"""
 
     async def mock_create_subprocess_shell(
-        cmd, stdin=None, stdout=None, stderr=None, env=None, cwd=None
+        cmd,
+        stdin=None,
+        stdout=None,
+        stderr=None,
+        env=None,
+        cwd=None,
+        start_new_session=False,
     ):
         # Return mock process with stderr for ls command
         if "ls" in cmd:
@@ -0,0 +1,97 @@
+"""Test streaming of command output through MCP notifications."""
+
+import base64
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import RequestParams
+
+from mcp_shell_server.server import ExecuteToolHandler
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setenv("ALLOW_COMMANDS", "printf")
+    monkeypatch.setenv("MCP_SHELL_EXEC_MODE", "direct")
+    return ExecuteToolHandler()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_progress_notifications(handler):
+    session = MagicMock()
+    session.send_progress_notification = AsyncMock()
+    token = request_ctx.set(
+        RequestContext(
+            request_id=1,
+            meta=RequestParams.Meta(progressToken="tok"),
+            session=session,
+            lifespan_context=None,
+        )
+    )
+    try:
+        result = await handler.run_tool(
+            {
+                "command": ["printf", "line1\\nline2\\n"],
+                "directory": "/tmp",
+                "stream": True,
+            }
+        )
+    finally:
+        request_ctx.reset(token)
+
+    assert len(result) == 1
+    assert "12 bytes de stdout" in result[0].text
+    messages = [
+        call.kwargs["message"]
+        for call in session.send_progress_notification.await_args_list
+    ]
+    assert "".join(messages) == "line1\nline2\n"
+    assert session.send_progress_notification.await_args.args[0] == "tok"
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_log_messages_without_progress_token(handler):
+    session = MagicMock()
+    session.send_log_message = AsyncMock()
+    token = request_ctx.set(
+        RequestContext(request_id=1, meta=None, session=session, lifespan_context=None)
+    )
+    try:
+        await handler.run_tool(
+            {"command": ["printf", "hello"], "directory": "/tmp", "stream": True}
+        )
+    finally:
+        request_ctx.reset(token)
+
+    session.send_log_message.assert_awaited_once()
+    assert session.send_log_message.await_args.kwargs["data"] == {
+        "stream": "stdout",
+        "text": "hello",
+    }
+
+
+@pytest.mark.asyncio
+async def test_stream_outside_request_returns_summary(handler):
+    result = await handler.run_tool(
+        {"command": ["printf", "abc"], "directory": "/tmp", "stream": True}
+    )
+    assert result[0].text.startswith("Comando finalizado com status 0")
+    assert "3 bytes de stdout" in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_binary_result_is_embedded_resource(handler):
+    result = await handler.run_tool(
+        {
+            "command": ["printf", "\\037\\213\\377"],
+            "directory": "/tmp",
+            "binary": True,
+        }
+    )
+
+    assert len(result) == 1
+    assert result[0].type == "resource"
+    assert base64.b64decode(result[0].resource.blob) == b"\x1f\x8b\xff"
+    assert result[0].resource.mimeType == "application/octet-stream"
@@ -425,6 +425,10 @@ async def test_pipe_commands(
     )
     assert result["stdout"].strip() == "WORLD"
 
+    # Every stage keeps its arguments
+    stages = mock_process_manager.execute_pipeline.call_args.args[0]
+    assert stages == ["echo 'hello world'", "cut -d ' ' -f2", "tr a-z A-Z"]
+
 
 @pytest.mark.asyncio
 async def test_output_redirection(
@@ -990,3 +994,71 @@ async def test_execute_with_empty_env(
     assert result["error"] is None
     assert result["status"] == 0
     assert len(result["stdout"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_direct_exec_mode(mock_process_manager, temp_test_dir, monkeypatch):
+    """Test that direct mode bypasses the shell for plain commands"""
+    from mcp_shell_server.shell_executor import ShellExecutor
+
+    clear_env(monkeypatch)
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo")
+    mock_process = AsyncMock()
+    mock_process.returncode = 0
+    mock_process_manager.create_exec_process = AsyncMock(return_value=mock_process)
+    mock_process_manager.execute_with_timeout.return_value = (b"hello\n", b"")
+
+    executor = ShellExecutor(process_manager=mock_process_manager, exec_mode="direct")
+    result = await executor.execute(["echo", "hello"], temp_test_dir)
+
+    assert result["stdout"] == "hello"
+    assert result["spawn_mode"] == "direct"
+    argv = mock_process_manager.create_exec_process.call_args.args[0]
+    assert argv == ["echo", "hello"]
+    mock_process_manager.create_process.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_direct_exec_mode_falls_back_to_shell(
+    mock_process_manager, temp_test_dir, monkeypatch
+):
+    """Test that commands without an executable on PATH still use the shell"""
+    from mcp_shell_server.shell_executor import ShellExecutor
+
+    clear_env(monkeypatch)
+    monkeypatch.setenv("ALLOW_COMMANDS", "no_such_builtin_xyz")
+    mock_process_manager.create_exec_process = AsyncMock()
+
+    executor = ShellExecutor(process_manager=mock_process_manager, exec_mode="direct")
+    result = await executor.execute(["no_such_builtin_xyz"], temp_test_dir)
+
+    assert result["spawn_mode"] == "shell"
+    mock_process_manager.create_exec_process.assert_not_called()
+    mock_process_manager.create_process.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_direct_exec_mode_real_process(temp_test_dir, monkeypatch):
+    """Test direct execution against a real process"""
+    from mcp_shell_server.shell_executor import ShellExecutor
+
+    clear_env(monkeypatch)
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo")
+    monkeypatch.setenv("MCP_SHELL_EXEC_MODE", "direct")
+
+    executor = ShellExecutor()
+    result = await executor.execute(["echo", "hello  world"], temp_test_dir)
+
+    assert result["error"] is None
+    assert result["stdout"] == "hello  world"
+    assert result["stderr"] == ""
+    assert result["spawn_mode"] == "direct"
+
+
+def test_invalid_exec_mode(monkeypatch):
+    """Test that an unknown exec mode is rejected"""
+    from mcp_shell_server.shell_executor import ShellExecutor
+
+    monkeypatch.setenv("MCP_SHELL_EXEC_MODE", "bogus")
+    with pytest.raises(ValueError, match="Invalid exec mode: bogus"):
+        ShellExecutor()
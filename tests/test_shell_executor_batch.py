@@ -0,0 +1,85 @@
+"""Test cases for batch execution of independent commands."""
+
+import json
+
+import pytest
+
+from mcp_shell_server.server import BatchToolHandler, ExecuteToolHandler
+from mcp_shell_server.shell_executor import ShellExecutor
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo,sleep,false")
+    return ShellExecutor(exec_mode="direct")
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_concurrently(executor, temp_test_dir):
+    items = [
+        {"command": ["sleep", "0.3"], "directory": temp_test_dir} for _ in range(4)
+    ]
+    items.append({"command": ["echo", "done"], "directory": temp_test_dir})
+    try:
+        batch = await executor.execute_batch(items, max_parallel=5)
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert batch["succeeded"] == 5
+    assert [result["index"] for result in batch["results"]] == list(range(5))
+    assert batch["results"][4]["stdout"] == "done"
+    assert batch["wall_time"] < 0.9
+    assert batch["total_execution_time"] >= 1.2
+
+
+@pytest.mark.asyncio
+async def test_batch_continue_on_error(executor, temp_test_dir):
+    items = [
+        {"command": ["false"], "directory": temp_test_dir},
+        {"command": ["rm", "-rf", "x"], "directory": temp_test_dir},
+        {"command": ["echo", "ok"], "directory": temp_test_dir},
+    ]
+    try:
+        batch = await executor.execute_batch(items)
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert (batch["succeeded"], batch["failed"], batch["skipped"]) == (1, 2, 0)
+    assert batch["results"][1]["error"] == "Command not allowed: rm"
+
+
+@pytest.mark.asyncio
+async def test_batch_fail_fast_cancels_remaining(executor, temp_test_dir):
+    items = [{"command": ["false"], "directory": temp_test_dir}] + [
+        {"command": ["sleep", "5"], "directory": temp_test_dir} for _ in range(3)
+    ]
+    try:
+        batch = await executor.execute_batch(items, max_parallel=2, fail_fast=True)
+    finally:
+        await executor.process_manager.cleanup_all()
+
+    assert batch["failed"] == 1
+    assert batch["skipped"] == 3
+    assert all(result.get("skipped") for result in batch["results"][1:])
+    assert batch["wall_time"] < 2
+
+
+@pytest.mark.asyncio
+async def test_batch_tool(monkeypatch, temp_test_dir):
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo")
+    monkeypatch.setenv("MCP_SHELL_EXEC_MODE", "direct")
+    handler = BatchToolHandler(ExecuteToolHandler())
+    result = await handler.run_tool(
+        {
+            "commands": [
+                {"command": ["echo", str(i)], "directory": temp_test_dir}
+                for i in range(3)
+            ]
+        }
+    )
+
+    batch = json.loads(result[0].text)
+    assert [item["stdout"] for item in batch["results"]] == ["0", "1", "2"]
+
+    with pytest.raises(ValueError, match="'commands' deve ser um array não vazio"):
+        await handler.run_tool({"commands": []})
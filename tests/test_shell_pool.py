@@ -0,0 +1,140 @@
+"""Tests for the shell worker pool."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+
+from mcp_shell_server.shell_executor import ShellExecutor
+from mcp_shell_server.shell_pool import ShellWorkerPool
+
+
+async def spawn_sh():
+    """Start a plain /bin/sh worker."""
+    return await asyncio.create_subprocess_exec(
+        "/bin/sh",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+
+
+@pytest_asyncio.fixture
+async def pool():
+    """Fixture for a small pool of /bin/sh workers."""
+    pool = ShellWorkerPool(spawn_sh, min_size=0, max_size=2, max_commands=3)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_commands(pool, tmp_path):
+    """Test output, exit code, directory and environment of pooled commands."""
+    stdout, stderr, returncode = await pool.run("printf 'a\\nb'")
+    assert (stdout, stderr, returncode) == (b"a\nb", b"", 0)
+
+    stdout, stderr, returncode = await pool.run(
+        "pwd; echo \"$FOO\" >&2; exit 3", str(tmp_path), envs={"FOO": "bar baz"}
+    )
+    assert stdout.strip() == str(tmp_path).encode()
+    assert stderr == b"bar baz\n"
+    assert returncode == 3
+
+    # Environment and directory changes do not leak into the worker
+    stdout, _, _ = await pool.run('pwd; echo "${FOO:-unset}"')
+    assert stdout.split(b"\n")[1] == b"unset"
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_worker_after_max_commands(pool):
+    """Test that workers are replaced after max_commands commands."""
+    pids = []
+    for _ in range(4):
+        stdout, _, _ = await pool.run("echo $$")
+        pids.append(stdout.strip())
+
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+
+
+@pytest.mark.asyncio
+async def test_pool_discards_worker_on_timeout(pool):
+    """Test that a timed out command takes its worker down."""
+    first, _, _ = await pool.run("echo $$")
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run("sleep 5", timeout=0.2)
+    assert pool.size == 0
+
+    second, _, _ = await pool.run("echo $$")
+    assert second != first
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_idle_workers():
+    """Test that idle workers above min_size are evicted."""
+    pool = ShellWorkerPool(spawn_sh, min_size=1, max_size=2, idle_timeout=0.1)
+    try:
+        await pool.start()
+        workers = [await pool.acquire(), await pool.acquire()]
+        for worker in workers:
+            await pool.release(worker)
+        assert pool.size == 2
+
+        await asyncio.sleep(0.5)
+        assert pool.size == 1
+        assert pool.idle_count == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_dead_worker(pool):
+    """Test that a worker killed while idle is not handed out."""
+    pool.health_check_interval = 0
+    worker = await pool.acquire()
+    await pool.release(worker)
+    worker.process.kill()
+    await worker.process.wait()
+
+    stdout, _, returncode = await pool.run("echo ok")
+    assert (stdout, returncode) == (b"ok\n", 0)
+
+
+def test_build_script_rejects_invalid_env_name():
+    """Test that environment variable names are validated."""
+    with pytest.raises(ValueError, match="Invalid environment variable name"):
+        ShellWorkerPool.build_script("true", envs={"BAD NAME": "x"})
+
+
+def test_pool_size_validation():
+    """Test pool size limits."""
+    with pytest.raises(ValueError, match="max size"):
+        ShellWorkerPool(spawn_sh, min_size=0, max_size=0)
+    with pytest.raises(ValueError, match="min size"):
+        ShellWorkerPool(spawn_sh, min_size=3, max_size=2)
+
+
+@pytest.mark.asyncio
+async def test_executor_pool_mode(monkeypatch, tmp_path):
+    """Test that pool mode routes plain commands to the pool."""
+    monkeypatch.setenv("ALLOW_COMMANDS", "echo,cat")
+    mock_pool = MagicMock()
+    mock_pool.run = AsyncMock(return_value=(b"hello\n", b"", 0))
+    manager = MagicMock()
+    manager.get_shell_pool.return_value = mock_pool
+    manager.create_process = AsyncMock()
+    manager.execute_with_timeout = AsyncMock(return_value=(b"piped\n", b""))
+
+    executor = ShellExecutor(process_manager=manager, exec_mode="pool")
+    result = await executor.execute(["echo", "hello"], str(tmp_path))
+    assert result["stdout"] == "hello"
+    assert result["spawn_mode"] == "pool"
+    assert mock_pool.run.call_args.args[:2] == ("echo hello", str(tmp_path))
+
+    # Commands with stdin are spawned as usual
+    result = await executor.execute(["cat"], str(tmp_path), stdin="piped")
+    assert result["stdout"] == "piped"
+    assert result["spawn_mode"] == "shell"
+    assert mock_pool.run.call_count == 1